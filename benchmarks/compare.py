@@ -0,0 +1,34 @@
+"""Сравнение двух отчётов бенчмарков.
+
+    python -m benchmarks.compare old.json new.json
+"""
+import json
+import sys
+
+
+def load(path):
+    with open(path, encoding='utf-8') as source:
+        report = json.load(source)
+    return {(row['view'], row['scale']): row for row in report['results']}
+
+
+def main(old_path, new_path):
+    old, new = load(old_path), load(new_path)
+    print(f'{"view":<22}{"scale":>9}{"median, ms":>25}'
+          f'{"queries":>13}{"peak, KiB":>24}')
+    for key in sorted(old.keys() & new.keys(), key=lambda k: (k[1], k[0])):
+        before, after = old[key], new[key]
+        ratio = (after['latency_ms']['median']
+                 / max(before['latency_ms']['median'], 1e-9))
+        print(f'{key[0]:<22}{key[1]:>9}'
+              f'{before["latency_ms"]["median"]:>9.2f} -> '
+              f'{after["latency_ms"]["median"]:<7.2f}x{ratio:<4.2f}'
+              f'{before["queries"]:>5} -> {after["queries"]:<4}'
+              f'{before["peak_memory_kb"]:>10.1f} -> '
+              f'{after["peak_memory_kb"]:<10.1f}')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        sys.exit(__doc__)
+    main(*sys.argv[1:])
@@ -0,0 +1,158 @@
+"""Нагрузочные замеры view-функций posts.
+
+Запуск: ``pytest benchmarks/ --bench-scales=10000,100000``. Отчёт в JSON
+(``--bench-report``) можно сравнить с отчётом прошлого релиза через
+``python -m benchmarks.compare old.json new.json``.
+"""
+import json
+import platform
+import time
+import tracemalloc
+from statistics import median
+
+import django
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import mixer
+
+pytest_plugins = [
+    'tests.fixtures.fixture_user',
+    'tests.fixtures.fixture_data',
+]
+
+DEFAULT_SCALES = '10000,100000,1000000'
+SEED_BATCH = 10000
+AUTHORS = 100
+GROUPS = 10
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('benchmarks')
+    group.addoption('--bench-scales', default=DEFAULT_SCALES,
+                    help='Число постов в базе, через запятую.')
+    group.addoption('--bench-rounds', type=int, default=20,
+                    help='Сколько раз запрашивать каждую страницу.')
+    group.addoption('--bench-report', default='bench_report.json',
+                    help='Куда записать отчёт.')
+    group.addoption('--bench-duration', type=float, default=5.0,
+                    help='Сколько секунд длится нагрузочный тест.')
+
+
+def pytest_generate_tests(metafunc):
+    if 'scale' in metafunc.fixturenames:
+        scales = sorted(
+            int(scale)
+            for scale in metafunc.config.getoption('bench_scales').split(',')
+        )
+        metafunc.parametrize('scale', scales, scope='session')
+
+
+class Dataset:
+    """Посты наращиваются от меньшего масштаба к большему, без
+    пересоздания базы между масштабами."""
+
+    def __init__(self):
+        from posts.models import Group, User
+
+        self.authors = mixer.cycle(AUTHORS).blend(User)
+        self.groups = mixer.cycle(GROUPS).blend(Group)
+        self.size = 0
+
+    def grow_to(self, size):
+        from posts.models import Post
+
+        while self.size < size:
+            batch = min(SEED_BATCH, size - self.size)
+            Post.objects.bulk_create(
+                Post(text=f'Пост номер {self.size + i}',
+                     author=self.authors[(self.size + i) % AUTHORS],
+                     group=self.groups[(self.size + i) % GROUPS])
+                for i in range(batch)
+            )
+            self.size += batch
+
+
+@pytest.fixture(scope='session')
+def django_db_modify_db_settings(tmp_path_factory):
+    # Тестовая база в файле, как в бою: у SQLite в памяти нет WAL, а
+    # соединения разных потоков делят один кэш с блокировками таблиц.
+    from django.conf import settings
+
+    path = tmp_path_factory.mktemp('bench') / 'db.sqlite3'
+    settings.DATABASES['default'].setdefault('TEST', {})['NAME'] = str(path)
+
+
+@pytest.fixture(scope='session')
+def dataset(django_db_setup, django_db_blocker):
+    with django_db_blocker.unblock():
+        return Dataset()
+
+
+@pytest.fixture(scope='session')
+def seeded(dataset, scale, django_db_blocker):
+    """Набор данных, выращенный до масштаба замера."""
+    # Вне транзакции теста: данные переживают откат после каждого замера.
+    with django_db_blocker.unblock():
+        dataset.grow_to(scale)
+    return dataset
+
+
+@pytest.fixture(scope='session')
+def bench_report(request):
+    results = []
+    yield results
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'rounds': request.config.getoption('bench_rounds'),
+        'results': results,
+    }
+    path = request.config.getoption('bench_report')
+    with open(path, 'w', encoding='utf-8') as target:
+        json.dump(report, target, ensure_ascii=False, indent=2,
+                  sort_keys=True)
+
+
+@pytest.fixture
+def measure(request, bench_report, settings):
+    """Замерить запрос: задержку, число SQL-запросов и пик памяти."""
+    # Кэш целых страниц спрятал бы работу view; карточки постов остаются
+    # в кэше, как в бою.
+    settings.FEED_PAGE_CACHE_TIMEOUT = 0
+    rounds = request.config.getoption('bench_rounds')
+
+    def run(name, scale, do_request, timings=None, **extra):
+        """``timings`` — уже снятые задержки (мс), например из потоков
+        нагрузочного теста; ``extra`` дописывается в результат."""
+        response = do_request()
+        assert response.status_code in (200, 302), (name, response)
+        if timings is None:
+            timings = []
+            for _ in range(rounds):
+                started = time.perf_counter()
+                do_request()
+                timings.append((time.perf_counter() - started) * 1000)
+        with CaptureQueriesContext(connection) as queries:
+            tracemalloc.start()
+            do_request()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        timings.sort()
+        result = {
+            'view': name,
+            'scale': scale,
+            'latency_ms': {
+                'min': round(timings[0], 3),
+                'median': round(median(timings), 3),
+                'p95': round(timings[int(len(timings) * 0.95) - 1], 3),
+            },
+            'queries': len(queries.captured_queries),
+            'peak_memory_kb': round(peak / 1024, 1),
+            **extra,
+        }
+        bench_report.append(result)
+        return result
+    return run
@@ -0,0 +1,110 @@
+"""Пропускная способность главной страницы при множестве медленных
+клиентов: WSGI с пулом рабочих потоков против ASGI (yatube.asgi).
+
+Медленный клиент — задержка ``SLOW_CLIENT_DELAY`` при отдаче ответа.
+Под WSGI поток занят, пока клиент не дочитает ответ; под ASGI отдачу
+ждёт поток событий, а потоки пула (ASYNC_VIEW_THREADS) уже заняты
+следующими запросами. Размер пула WSGI равен ASYNC_VIEW_THREADS."""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.core.wsgi import get_wsgi_application
+from django.db import connections
+from django.test import RequestFactory
+from django.urls import reverse
+
+CLIENTS = 64
+REQUESTS_PER_CLIENT = 4
+SLOW_CLIENT_DELAY = 0.05
+
+
+def wsgi_load(url, workers):
+    application = get_wsgi_application()
+    environ = RequestFactory().get(url).environ
+
+    def request():
+        statuses = []
+        response = application(
+            dict(environ), lambda status, headers: statuses.append(status),
+        )
+        for _ in response:
+            pass
+        response.close()
+        time.sleep(SLOW_CLIENT_DELAY)
+        return int(statuses[0].split()[0])
+
+    def client():
+        try:
+            return [request() for _ in range(REQUESTS_PER_CLIENT)]
+        finally:
+            connections.close_all()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(client) for _ in range(CLIENTS)]
+        return [status for future in futures for status in future.result()]
+
+
+def asgi_load(url):
+    from yatube.asgi import application
+
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': url,
+        'raw_path': url.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [(b'host', b'testserver')],
+        'server': ('testserver', 80),
+        'client': ('127.0.0.1', 0),
+    }
+
+    async def request():
+        status = None
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            elif not message.get('more_body'):
+                await asyncio.sleep(SLOW_CLIENT_DELAY)
+
+        await application(dict(scope), receive, send)
+        return status
+
+    async def client():
+        return [await request() for _ in range(REQUESTS_PER_CLIENT)]
+
+    async def load():
+        results = await asyncio.gather(*(client() for _ in range(CLIENTS)))
+        return [status for statuses in results for status in statuses]
+
+    return asyncio.run(load())
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('server', ['wsgi', 'asgi'])
+def test_index_slow_clients(client, measure, scale, seeded, settings,
+                            server):
+    url = reverse('index')
+    started = time.perf_counter()
+    if server == 'wsgi':
+        statuses = wsgi_load(url, settings.ASYNC_VIEW_THREADS)
+    else:
+        statuses = asgi_load(url)
+    elapsed = time.perf_counter() - started
+    assert set(statuses) == {200}
+    # Задержка и запросы — одного синхронного запроса к той же странице.
+    measure(
+        f'index x{CLIENTS} slow clients [{server}]', scale,
+        lambda: client.get(url),
+        requests_per_s=round(len(statuses) / elapsed, 1),
+    )
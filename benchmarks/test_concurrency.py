@@ -0,0 +1,128 @@
+"""Чтение ленты несколькими потоками, пока другой поток публикует посты
+через new_post: с PRAGMA по умолчанию и с боевыми
+(yatube.settings.production.SQLITE_PRAGMAS).
+
+Длительность нагрузки — ``--bench-duration`` секунд на профиль."""
+import threading
+import time
+
+import pytest
+from django.db import OperationalError, connection, connections
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from yatube.settings import profiles
+
+production = profiles.production()
+
+READERS = 4
+WRITTEN_TEXT = 'Пост нагрузочного теста'
+PROFILES = {
+    'production': production.SQLITE_PRAGMAS,
+    'default': {},
+}
+
+
+def set_journal_mode(mode):
+    # Режим журнала хранится в файле базы, и из WAL его выводит только
+    # единственное соединение вне транзакции — основное, между тестами.
+    with connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA journal_mode={mode}')
+
+
+@pytest.fixture(scope='module', params=list(PROFILES))
+def pragmas(request, django_db_setup, django_db_blocker):
+    profile = PROFILES[request.param]
+    with django_db_blocker.unblock():
+        set_journal_mode(profile.get('journal_mode', 'DELETE'))
+        with override_settings(SQLITE_PRAGMAS=profile):
+            yield request.param
+        # Остальные замеры идут с журналом отката, как без PRAGMA.
+        set_journal_mode('DELETE')
+
+
+class Load:
+    def __init__(self, duration, threads):
+        self.duration = duration
+        # Нагрузка начинается, когда все потоки готовы: писатель входит
+        # на сайт до неё, иначе вход не дождётся блокировки базы.
+        self.ready = threading.Barrier(threads, action=self.start)
+        self.lock = threading.Lock()
+        self.read_timings = []
+        self.writes = 0
+        self.errors = 0
+
+    def start(self):
+        self.deadline = time.perf_counter() + self.duration
+
+    def loop(self, do_request, on_success):
+        try:
+            self.ready.wait()
+            while time.perf_counter() < self.deadline:
+                started = time.perf_counter()
+                try:
+                    do_request()
+                except OperationalError:
+                    with self.lock:
+                        self.errors += 1
+                    continue
+                with self.lock:
+                    on_success((time.perf_counter() - started) * 1000)
+        finally:
+            # Новые соединения потоков получают PRAGMA текущего профиля.
+            connections.close_all()
+
+    def read(self, url):
+        client = Client()
+        self.loop(lambda: client.get(url), self.read_timings.append)
+
+    def write(self, author):
+        from posts.models import Post
+
+        client = Client()
+        url = reverse('new_post')
+        try:
+            try:
+                client.force_login(author)
+            except Exception:
+                # Без писателя замер не имеет смысла: читатели не ждут.
+                self.ready.abort()
+                raise
+            self.loop(lambda: client.post(url, {'text': WRITTEN_TEXT}),
+                      self.count_write)
+        finally:
+            # Поток пишет в своём соединении вне транзакции теста, так
+            # что убирает за собой сам.
+            Post.objects.filter(text=WRITTEN_TEXT).delete()
+            connections.close_all()
+
+    def count_write(self, elapsed):
+        self.writes += 1
+
+
+@pytest.mark.django_db
+def test_index_reads_while_writing(request, client, measure, scale, seeded,
+                                   pragmas):
+    url = reverse('index')
+    load = Load(request.config.getoption('bench_duration'), READERS + 1)
+    threads = [
+        threading.Thread(target=load.read, args=(url,))
+        for _ in range(READERS)
+    ]
+    threads.append(threading.Thread(target=load.write,
+                                    args=(seeded.authors[0],)))
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    measure(
+        f'index+new_post x{READERS} [{pragmas}]', scale,
+        lambda: client.get(url),
+        timings=sorted(load.read_timings),
+        reads_per_s=round(len(load.read_timings) / elapsed, 1),
+        writes_per_s=round(load.writes / elapsed, 1),
+        errors=load.errors,
+    )
+    assert load.writes > 0
@@ -0,0 +1,51 @@
+"""Время рендеринга страниц лент с настройками шаблонов разработки
+и боевыми (cached-загрузчик, yatube.settings.production).
+
+Кэш карточек очищается перед каждым запросом, чтобы замерять именно
+шаблоны."""
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from yatube.settings import profiles
+
+production = profiles.production()
+
+PROFILES = {
+    'default': None,
+    'production': production.TEMPLATES,
+}
+
+
+@pytest.fixture(params=list(PROFILES))
+def templates_profile(request, settings):
+    if PROFILES[request.param] is not None:
+        settings.TEMPLATES = PROFILES[request.param]
+    return request.param
+
+
+@pytest.mark.django_db
+class TestFeedRendering:
+
+    def render(self, client, url):
+        def do_request():
+            cache.clear()
+            return client.get(url)
+        return do_request
+
+    def test_index(self, client, measure, scale, seeded, templates_profile):
+        measure(f'render index [{templates_profile}]', scale,
+                self.render(client, reverse('index')))
+
+    def test_group_posts(self, client, measure, scale, seeded,
+                         templates_profile):
+        url = reverse('group_posts', kwargs={'slug': seeded.groups[0].slug})
+        measure(f'render group_posts [{templates_profile}]', scale,
+                self.render(client, url))
+
+    def test_profile(self, client, measure, scale, seeded,
+                     templates_profile):
+        url = reverse('profile',
+                      kwargs={'username': seeded.authors[0].username})
+        measure(f'render profile [{templates_profile}]', scale,
+                self.render(client, url))
@@ -0,0 +1,152 @@
+import pytest
+from django.urls import reverse
+
+from yatube.settings import PAGINATE_BY
+
+FOLLOWEES = 2000
+
+
+@pytest.fixture(scope='session')
+def timelines_backfilled(seeded, scale, django_db_blocker):
+    from django.core.management import call_command
+
+    with django_db_blocker.unblock():
+        call_command('backfill_timelines', verbosity=0)
+    return seeded
+
+
+@pytest.fixture(scope='session')
+def follower(seeded, django_db_blocker):
+    """Читатель, подписанный на всех авторов и ещё на тысячи молчащих."""
+    from posts.models import Follow, User
+
+    with django_db_blocker.unblock():
+        user, created = User.objects.get_or_create(username='follower')
+        if created:
+            User.objects.bulk_create(
+                User(username=f'idle{i}')
+                for i in range(FOLLOWEES - len(seeded.authors))
+            )
+            # bulk_create в SQLite не возвращает id — берём их запросом.
+            idle = User.objects.filter(username__startswith='idle')
+            Follow.objects.bulk_create(
+                Follow(user=user, author_id=author_id)
+                for author_id in [author.pk for author in seeded.authors]
+                + list(idle.values_list('pk', flat=True))
+            )
+    return user
+
+
+@pytest.fixture
+def sample_post(seeded):
+    from posts.models import Post
+
+    return Post.objects.select_related('author', 'group').order_by('pk')[0]
+
+
+@pytest.mark.django_db
+class TestFeedViews:
+
+    def test_index(self, client, measure, scale, seeded):
+        url = reverse('index')
+        measure('index', scale, lambda: client.get(url))
+
+    def test_index_deep_page(self, client, measure, scale, seeded):
+        url = reverse('index')
+        last = (scale + PAGINATE_BY - 1) // PAGINATE_BY
+        measure('index?page=last', scale,
+                lambda: client.get(url, {'page': last}))
+
+    def test_group_posts(self, client, measure, scale, sample_post):
+        url = reverse('group_posts', kwargs={'slug': sample_post.group.slug})
+        measure('group_posts', scale, lambda: client.get(url))
+
+    def test_profile(self, client, measure, scale, sample_post):
+        url = reverse('profile',
+                      kwargs={'username': sample_post.author.username})
+        measure('profile', scale, lambda: client.get(url))
+
+
+@pytest.mark.django_db
+class TestTimelineFeedViews:
+    """Ленты групп и авторов из материализованных лент (FEED_TIMELINES)."""
+
+    @pytest.fixture(autouse=True)
+    def enable_timelines(self, settings, timelines_backfilled):
+        settings.FEED_TIMELINES = True
+
+    def test_group_posts(self, client, measure, scale, sample_post):
+        url = reverse('group_posts', kwargs={'slug': sample_post.group.slug})
+        measure('group_posts [timeline]', scale, lambda: client.get(url))
+
+    def test_group_posts_deep_page(self, client, measure, scale,
+                                   sample_post):
+        url = reverse('group_posts', kwargs={'slug': sample_post.group.slug})
+        last = sample_post.group.posts_count // PAGINATE_BY
+        measure('group_posts?page=last [timeline]', scale,
+                lambda: client.get(url, {'page': last}))
+
+    def test_profile(self, client, measure, scale, sample_post):
+        url = reverse('profile',
+                      kwargs={'username': sample_post.author.username})
+        measure('profile [timeline]', scale, lambda: client.get(url))
+
+
+@pytest.mark.django_db
+class TestFollowFeedViews:
+    """Лента подписок на FOLLOWEES авторов."""
+
+    def test_follow_index(self, client, measure, scale, follower):
+        client.force_login(follower)
+        url = reverse('follow_index')
+        measure('follow_index', scale, lambda: client.get(url))
+
+    def test_follow_index_next_page(self, client, measure, scale, follower):
+        client.force_login(follower)
+        url = reverse('follow_index')
+        cursor = client.get(url).context['page'].next_cursor
+        measure('follow_index?cursor=next', scale,
+                lambda: client.get(url, {'cursor': cursor}))
+
+
+@pytest.mark.django_db
+class TestPostViews:
+
+    def test_post_view(self, client, measure, scale, sample_post):
+        url = reverse('post', kwargs={
+            'username': sample_post.author.username,
+            'post_id': sample_post.pk,
+        })
+        measure('post_view', scale, lambda: client.get(url))
+
+    def test_post_edit(self, client, measure, scale, sample_post):
+        client.force_login(sample_post.author)
+        url = reverse('post_edit', kwargs={
+            'username': sample_post.author.username,
+            'post_id': sample_post.pk,
+        })
+        data = {'text': sample_post.text, 'group': sample_post.group_id}
+        measure('post_edit', scale, lambda: client.get(url))
+        measure('post_edit [POST]', scale, lambda: client.post(url, data))
+
+    def test_new_post(self, client, measure, scale, sample_post, settings,
+                      tmp_path):
+        """Побочная работа публикации (миниатюры) уходит в очередь задач:
+        задержка с картинкой не должна расти на время её обработки."""
+        from io import BytesIO
+
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from PIL import Image
+
+        settings.MEDIA_ROOT = str(tmp_path)
+        buffer = BytesIO()
+        Image.new('RGB', (1600, 1200), 'red').save(buffer, 'JPEG')
+        client.force_login(sample_post.author)
+        url = reverse('new_post')
+        measure('new_post [POST]', scale,
+                lambda: client.post(url, {'text': 'Новый пост'}))
+        measure('new_post [POST, image]', scale, lambda: client.post(url, {
+            'text': 'Новый пост',
+            'image': SimpleUploadedFile('photo.jpg', buffer.getvalue(),
+                                        'image/jpeg'),
+        }))
@@ -0,0 +1,62 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from metrics.recorder import (
+    METRICS, PERCENTILES, load, summarize, summarize_cards,
+    summarize_templates,
+)
+
+
+class Command(BaseCommand):
+    help = ('Печатает перцентили времени, числа SQL-запросов и времени '
+            'шаблонов по view из буферов, сохранённых в '
+            'REQUEST_METRICS_DIR.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dir', default=settings.REQUEST_METRICS_DIR,
+            help='Каталог с буферами процессов.',
+        )
+        parser.add_argument(
+            '--templates', action='store_true',
+            help='Показать время по шаблонам (нужен TEMPLATE_PROFILING).',
+        )
+
+    def handle(self, *args, **options):
+        directory = options['dir']
+        if not directory:
+            raise CommandError('Задайте REQUEST_METRICS_DIR или --dir.')
+        try:
+            samples = load(directory)
+        except OSError as error:
+            raise CommandError(error)
+        if options['templates']:
+            self.print_templates(samples)
+            return
+        summary = summarize(samples)
+        if not summary:
+            self.stdout.write('Замеров пока нет.')
+            return
+        columns = [f'{metric} p{percent}'
+                   for metric in METRICS for percent in PERCENTILES]
+        self.stdout.write('\t'.join(['view', 'count'] + columns))
+        for view, stats in summary.items():
+            values = [str(stats[metric][f'p{percent}'])
+                      for metric in METRICS for percent in PERCENTILES]
+            self.stdout.write('\t'.join([view, str(stats['count'])] + values))
+        cards = summarize_cards(samples)
+        self.stdout.write(
+            f'Карточки постов: из кэша {cards["hits"]}, отрисовано '
+            f'{cards["misses"]}, доля попаданий {cards["hit_ratio"]}'
+        )
+
+    def print_templates(self, samples):
+        templates = summarize_templates(samples)
+        if not templates:
+            self.stdout.write('Профилей шаблонов нет.')
+            return
+        self.stdout.write('template\trenders\ttotal_ms')
+        for name, stats in templates.items():
+            self.stdout.write(
+                f'{name}\t{stats["renders"]}\t{stats["total_ms"]}'
+            )
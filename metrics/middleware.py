@@ -0,0 +1,83 @@
+import asyncio
+from time import perf_counter
+
+from django.conf import settings
+
+from .profiling import (
+    TemplateProfile, instrument_template_profiling, write_collapsed,
+)
+from .recorder import (
+    Measurement, capture_queries, current, instrument_templates, recorder,
+)
+
+
+class RequestMetricsMiddleware:
+    """Замеряет время view, число и время SQL-запросов и время
+    рендеринга шаблонов; отдаёт их в заголовке Server-Timing и копит
+    в кольцевом буфере (metrics.recorder).
+
+    Работает и под ASGI: тогда SQL-запросы считает пул потоков
+    posts.async_views, где view обращаются к базе.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Так Django опознаёт асинхронный экземпляр middleware.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+        instrument_templates()
+        instrument_template_profiling()
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        measurement, token, started = self.start()
+        try:
+            with capture_queries():
+                response = self.get_response(request)
+        finally:
+            current.reset(token)
+        return self.finish(request, response, measurement, started)
+
+    async def __acall__(self, request):
+        measurement, token, started = self.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current.reset(token)
+        return self.finish(request, response, measurement, started)
+
+    def start(self):
+        profile = TemplateProfile() if settings.TEMPLATE_PROFILING else None
+        measurement = Measurement(profile)
+        return measurement, current.set(measurement), perf_counter()
+
+    def finish(self, request, response, measurement, started):
+        wall_ms = (perf_counter() - started) * 1000
+        profile = measurement.profile
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+        sample = {
+            'view': view,
+            'status': response.status_code,
+            'wall_ms': wall_ms,
+            'sql_count': measurement.sql_count,
+            'sql_ms': measurement.sql_ms,
+            'template_ms': measurement.template_ms,
+            'card_hits': measurement.card_hits,
+            'card_misses': measurement.card_misses,
+        }
+        if profile is not None:
+            sample['templates'] = profile.totals_ms()
+            if settings.TEMPLATE_PROFILE_FILE:
+                write_collapsed(profile, view, settings.TEMPLATE_PROFILE_FILE)
+        recorder.add(sample)
+        response['Server-Timing'] = ', '.join((
+            f'total;dur={wall_ms:.1f}',
+            f'db;dur={measurement.sql_ms:.1f};'
+            f'desc="{measurement.sql_count} queries"',
+            f'tpl;dur={measurement.template_ms:.1f}',
+        ))
+        return response
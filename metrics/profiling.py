@@ -0,0 +1,84 @@
+"""Профилирование рендеринга шаблонов (включается TEMPLATE_PROFILING).
+
+Время каждого шаблона — в том числе подключённых через {% include %},
+{% extends %} и карточек posts.cards — делится на собственное и время
+вложенных шаблонов. По запросу копятся:
+
+* суммарное (включающее) время по имени шаблона — попадает в замер
+  запроса (metrics.recorder);
+* собственное время по стеку вызовов — в формате collapsed stacks
+  (``view;base.html;includes/post.html 1234``, микросекунды), который
+  понимают flamegraph.pl и speedscope. Строки дописываются в
+  TEMPLATE_PROFILE_FILE.
+"""
+from collections import Counter
+from time import perf_counter
+
+from django.template import base
+
+from .recorder import current
+
+
+class TemplateProfile:
+    def __init__(self):
+        self.stack = []
+        self.collapsed = Counter()
+        self.inclusive = Counter()
+
+    def enter(self, name):
+        self.stack.append([name, perf_counter(), 0.0])
+
+    def exit(self):
+        name, started, children = self.stack.pop()
+        elapsed = perf_counter() - started
+        path = ';'.join([frame[0] for frame in self.stack] + [name])
+        self.collapsed[path] += elapsed - children
+        if self.stack:
+            self.stack[-1][2] += elapsed
+        if name not in (frame[0] for frame in self.stack):
+            # Рекурсивный include не должен считаться дважды.
+            self.inclusive[name] += elapsed
+
+    def totals_ms(self):
+        return {name: round(seconds * 1000, 3)
+                for name, seconds in self.inclusive.most_common()}
+
+    def collapsed_lines(self, root):
+        for path, seconds in sorted(self.collapsed.items()):
+            yield f'{root};{path} {round(seconds * 1_000_000)}\n'
+
+
+def template_name(template):
+    if template.origin and template.origin.template_name:
+        return str(template.origin.template_name)
+    return template.name or '<string>'
+
+
+def instrument_template_profiling():
+    """Учитывать каждый Template._render в профиле текущего запроса.
+
+    Именно _render, а не render: родительский шаблон {% extends %}
+    рендерится в обход render.
+    """
+    if getattr(base.Template._render, 'profiled', False):
+        return
+    _render = base.Template._render
+
+    def profiled_render(self, context):
+        measurement = current.get()
+        profile = measurement.profile if measurement else None
+        if profile is None:
+            return _render(self, context)
+        profile.enter(template_name(self))
+        try:
+            return _render(self, context)
+        finally:
+            profile.exit()
+
+    profiled_render.profiled = True
+    base.Template._render = profiled_render
+
+
+def write_collapsed(profile, root, path):
+    with open(path, 'a', encoding='utf-8') as target:
+        target.writelines(profile.collapsed_lines(root))
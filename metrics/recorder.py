@@ -0,0 +1,199 @@
+"""Кольцевой буфер замеров запросов и их агрегаты.
+
+Каждый процесс копит последние ``REQUEST_METRICS_BUFFER`` замеров в
+памяти. Если задан ``REQUEST_METRICS_DIR``, процесс время от времени
+сохраняет свой буфер в ``<pid>.json`` в этом каталоге — оттуда замеры
+всех процессов читает ``manage.py request_metrics``.
+"""
+import json
+import math
+import os
+import threading
+from collections import deque
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+from django.template import base
+
+# Замер текущего запроса; None вне RequestMetricsMiddleware.
+current = ContextVar('request_metrics', default=None)
+
+METRICS = ('wall_ms', 'sql_count', 'sql_ms', 'template_ms')
+PERCENTILES = (50, 95, 99)
+
+
+class Measurement:
+    __slots__ = ('sql_count', 'sql_ms', 'template_ms', 'template_depth',
+                 'card_hits', 'card_misses', 'profile')
+
+    def __init__(self, profile=None):
+        self.sql_count = 0
+        self.sql_ms = 0.0
+        self.template_ms = 0.0
+        self.template_depth = 0
+        # Карточки постов из кэша и отрисованные заново (posts.cards)
+        self.card_hits = 0
+        self.card_misses = 0
+        # metrics.profiling.TemplateProfile, если профилирование включено
+        self.profile = profile
+
+
+def percentile(values, percent):
+    """Перцентиль методом ближайшего ранга по отсортированному списку."""
+    if not values:
+        return 0.0
+    rank = math.ceil(percent / 100 * len(values))
+    return values[max(rank, 1) - 1]
+
+
+def summarize_templates(samples):
+    """Суммарное время шаблонов по замерам с профилем шаблонов."""
+    totals = {}
+    for sample in samples:
+        for name, ms in sample.get('templates', {}).items():
+            stats = totals.setdefault(name, {'renders': 0, 'total_ms': 0.0})
+            stats['renders'] += 1
+            stats['total_ms'] += ms
+    return {
+        name: {'renders': stats['renders'],
+               'total_ms': round(stats['total_ms'], 3)}
+        for name, stats in sorted(totals.items(),
+                                  key=lambda item: -item[1]['total_ms'])
+    }
+
+
+def summarize_cards(samples):
+    """Попадания в кэш карточек постов по всем замерам."""
+    hits = sum(sample.get('card_hits', 0) for sample in samples)
+    misses = sum(sample.get('card_misses', 0) for sample in samples)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / total, 3) if total else 0.0,
+    }
+
+
+def summarize(samples):
+    by_view = {}
+    for sample in samples:
+        by_view.setdefault(sample['view'], []).append(sample)
+    summary = {}
+    for view, view_samples in sorted(by_view.items()):
+        stats = {'count': len(view_samples)}
+        for metric in METRICS:
+            values = sorted(sample[metric] for sample in view_samples)
+            stats[metric] = {
+                f'p{percent}': round(percentile(values, percent), 3)
+                for percent in PERCENTILES
+            }
+        summary[view] = stats
+    return summary
+
+
+class Recorder:
+    def __init__(self, size):
+        self.samples = deque(maxlen=size)
+        self.lock = threading.Lock()
+        self.since_flush = 0
+
+    def add(self, sample):
+        with self.lock:
+            self.samples.append(sample)
+            self.since_flush += 1
+            flush = self.since_flush >= settings.REQUEST_METRICS_FLUSH_EVERY
+            if flush:
+                self.since_flush = 0
+                samples = list(self.samples)
+        if flush and settings.REQUEST_METRICS_DIR:
+            dump(samples, settings.REQUEST_METRICS_DIR)
+
+    def snapshot(self):
+        with self.lock:
+            return list(self.samples)
+
+    def clear(self):
+        with self.lock:
+            self.samples.clear()
+            self.since_flush = 0
+
+
+def dump(samples, directory):
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f'{os.getpid()}.json')
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as target:
+        json.dump(samples, target)
+    os.replace(tmp_path, path)
+
+
+def load(directory):
+    samples = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.json'):
+            with open(os.path.join(directory, name),
+                      encoding='utf-8') as source:
+                samples.extend(json.load(source))
+    return samples
+
+
+recorder = Recorder(settings.REQUEST_METRICS_BUFFER)
+
+
+def sql_timer(measurement):
+    def wrapper(execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            measurement.sql_count += 1
+            measurement.sql_ms += (perf_counter() - started) * 1000
+    return wrapper
+
+
+@contextmanager
+def capture_queries():
+    """Считать SQL-запросы в текущем замере.
+
+    Соединения с базой у каждого потока свои, поэтому оборачиваются
+    соединения потока, где выполняется блок: код, уходящий в другой
+    поток (posts.async_views), вызывает capture_queries уже там.
+    """
+    measurement = current.get()
+    with ExitStack() as stack:
+        if measurement is not None:
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(sql_timer(measurement))
+                )
+        yield
+
+
+def instrument_templates():
+    """Считать время рендеринга шаблонов в текущем замере.
+
+    Template.render вызывается и для вложенных {% include %}, поэтому
+    время засчитывается только на внешнем уровне.
+    """
+    if getattr(base.Template.render, 'instrumented', False):
+        return
+    render = base.Template.render
+
+    def timed_render(self, context):
+        measurement = current.get()
+        if measurement is None:
+            return render(self, context)
+        measurement.template_depth += 1
+        started = perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            measurement.template_depth -= 1
+            if not measurement.template_depth:
+                measurement.template_ms += (perf_counter() - started) * 1000
+
+    timed_render.instrumented = True
+    base.Template.render = timed_render
@@ -0,0 +1,127 @@
+import re
+from io import StringIO
+from tempfile import TemporaryDirectory
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+from metrics.recorder import percentile, recorder
+from posts.models import Post, User
+
+
+@override_settings(FEED_PAGE_CACHE_TIMEOUT=0)
+class RequestMetricsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='ivan')
+        cls.staff = User.objects.create_user(username='admin',
+                                             is_staff=True)
+        Post.objects.create(text='Текст', author=cls.user)
+
+    def setUp(self):
+        recorder.clear()
+        self.guest_client = Client()
+
+    def test_server_timing_header(self):
+        response = self.guest_client.get(reverse('index'))
+        header = response['Server-Timing']
+        self.assertRegex(header, r'total;dur=[\d.]+')
+        self.assertRegex(header, r'tpl;dur=[\d.]+')
+        queries = re.search(r'desc="(\d+) queries"', header).group(1)
+        # Поколение ленты для ETag, COUNT и страница постов.
+        self.assertEqual(int(queries), 3)
+
+    def test_samples_are_recorded_per_view(self):
+        self.guest_client.get(reverse('index'))
+        self.guest_client.get(
+            reverse('profile', kwargs={'username': self.user.username}))
+        samples = recorder.snapshot()
+        self.assertEqual([s['view'] for s in samples], ['index', 'profile'])
+        self.assertEqual(samples[0]['sql_count'], 3)
+        self.assertGreater(samples[0]['template_ms'], 0)
+        self.assertLessEqual(samples[0]['template_ms'],
+                             samples[0]['wall_ms'])
+
+    def test_endpoint_is_staff_only(self):
+        url = reverse('request_metrics')
+        self.assertEqual(self.guest_client.get(url).status_code, 302)
+        client = Client()
+        client.force_login(self.staff)
+        self.guest_client.get(reverse('index'))
+        data = client.get(url).json()
+        self.assertEqual(data['views']['index']['count'], 1)
+        self.assertIn('p95', data['views']['index']['wall_ms'])
+        cards = data['post_cards']
+        self.assertEqual(cards['hits'] + cards['misses'], 1)
+
+    def test_command_reads_flushed_buffers(self):
+        with TemporaryDirectory() as directory:
+            with override_settings(REQUEST_METRICS_DIR=directory,
+                                   REQUEST_METRICS_FLUSH_EVERY=1):
+                self.guest_client.get(reverse('index'))
+            out = StringIO()
+            call_command('request_metrics', '--dir', directory, stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertTrue(lines[0].startswith('view\tcount\twall_ms p50'))
+        self.assertTrue(lines[1].startswith('index\t1\t'))
+        self.assertTrue(lines[-1].startswith('Карточки постов: из кэша'))
+
+    def test_command_requires_directory(self):
+        with self.assertRaises(CommandError):
+            call_command('request_metrics', stdout=StringIO())
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7], 95), 7)
+        self.assertEqual(percentile([], 95), 0.0)
+
+
+@override_settings(FEED_PAGE_CACHE_TIMEOUT=0, TEMPLATE_PROFILING=True)
+class TemplateProfilingTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='ivan')
+        Post.objects.bulk_create(
+            Post(text=f'Текст {i}', author=cls.user) for i in range(3)
+        )
+
+    def setUp(self):
+        recorder.clear()
+
+    def test_templates_are_attributed(self):
+        Client().get(reverse('post', kwargs={
+            'username': self.user.username,
+            'post_id': Post.objects.first().pk,
+        }))
+        templates = recorder.snapshot()[0]['templates']
+        for name in ('post.html', 'base.html', 'includes/post.html',
+                     'includes/author.html', 'includes/nav.html'):
+            with self.subTest(template=name):
+                self.assertIn(name, templates)
+        self.assertLessEqual(templates['includes/post.html'],
+                             templates['post.html'])
+
+    def test_collapsed_stacks_file(self):
+        with TemporaryDirectory() as directory:
+            path = f'{directory}/templates.folded'
+            with override_settings(TEMPLATE_PROFILE_FILE=path):
+                Client().get(reverse('profile', kwargs={
+                    'username': self.user.username}))
+            with open(path, encoding='utf-8') as source:
+                lines = source.read().splitlines()
+        stacks = dict(line.rsplit(' ', 1) for line in lines)
+        self.assertIn('profile;profile.html;base.html;includes/nav.html',
+                      stacks)
+        self.assertIn('profile;profile.html;base.html;'
+                      'includes/profilepost.html', stacks)
+        self.assertTrue(all(value.isdigit() for value in stacks.values()))
+
+    def test_disabled_by_default(self):
+        with override_settings(TEMPLATE_PROFILING=False):
+            Client().get(reverse('index'))
+        self.assertNotIn('templates', recorder.snapshot()[0])
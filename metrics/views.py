@@ -0,0 +1,17 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+
+from .recorder import (
+    recorder, summarize, summarize_cards, summarize_templates,
+)
+
+
+@staff_member_required
+def request_metrics(request):
+    samples = recorder.snapshot()
+    return JsonResponse({
+        'samples': len(samples),
+        'views': summarize(samples),
+        'templates': summarize_templates(samples),
+        'post_cards': summarize_cards(samples),
+    })
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Post, Group
+from .models import Comment, Post, Group
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -16,5 +16,13 @@ class GroupAdmin(admin.ModelAdmin):
     empty_value_display = ('-пусто-')
 
 
+class CommentAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'text', 'created', 'author', 'post')
+    search_fields = ('text',)
+    list_select_related = ('author', 'post')
+    empty_value_display = ('-пусто-')
+
+
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group, GroupAdmin)
+admin.site.register(Comment, CommentAdmin)
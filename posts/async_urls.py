@@ -0,0 +1,18 @@
+"""Маршруты posts для ASGI-входа: те же, что в posts.urls, но ленты
+и страница поста асинхронные."""
+from django.urls import URLPattern
+
+from . import async_views, urls
+
+ASYNC_VIEWS = {
+    'index': async_views.index,
+    'group_posts': async_views.group_posts,
+    'profile': async_views.profile,
+    'post': async_views.post_view,
+}
+
+urlpatterns = [
+    URLPattern(route.pattern, ASYNC_VIEWS.get(route.name, route.callback),
+               route.default_args, route.name)
+    for route in urls.urlpatterns
+]
@@ -0,0 +1,61 @@
+"""Асинхронные ленты и страница поста для ASGI-входа (yatube.asgi).
+
+Поток событий не ждёт ни базу, ни медленных клиентов: синхронные view
+из posts.views целиком (запросы к базе, рендеринг шаблонов) выполняются
+в пуле из ``ASYNC_VIEW_THREADS`` потоков, а отдачей ответа занимается
+сервер. Пул ограничивает и число одновременных соединений с базой.
+"""
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from metrics.recorder import capture_queries
+from . import views
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.ASYNC_VIEW_THREADS,
+                thread_name_prefix='async-views',
+            )
+    return _executor
+
+
+def _call(view, request, args, kwargs):
+    # Соединения потоков пула живут между запросами: закрываются по
+    # CONN_MAX_AGE и после ошибок, как в обработчике WSGI.
+    close_old_connections()
+    try:
+        with capture_queries():
+            return view(request, *args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+def in_thread_pool(view):
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        # contextvars (замер metrics, чтение с реплики) переходят в поток.
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            get_executor(), context.run, _call, view, request, args, kwargs,
+        )
+    return wrapper
+
+
+index = in_thread_pool(views.index)
+group_posts = in_thread_pool(views.group_posts)
+profile = in_thread_pool(views.profile)
+post_view = in_thread_pool(views.post_view)
@@ -0,0 +1,84 @@
+"""Кэш отрисованных карточек постов.
+
+Карточка (``includes/post.html`` и похожие шаблоны) рендерится один раз
+и хранится в кэше как готовый HTML-фрагмент. Ключ содержит
+``Post.cache_key`` (правка поста даёт новый ключ), а также признак
+«смотрит автор»: автору карточка показывает кнопку редактирования.
+Карточки удалённого поста убираются из кэша сразу (см. posts.signals).
+"""
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from metrics.recorder import current
+
+# Шаблоны карточек, которые кэшируются: по ним же сбрасывается кэш.
+CARD_TEMPLATES = (
+    'includes/post.html',
+    'includes/profilepost.html',
+)
+
+# Счётчики попаданий в пределах процесса; по всем процессам их
+# собирают замеры запросов (metrics: /metrics/requests/ и
+# manage.py request_metrics).
+_stats = Counter(hits=0, misses=0)
+
+
+def _count(hit):
+    _stats['hits' if hit else 'misses'] += 1
+    measurement = current.get()
+    if measurement is not None:
+        if hit:
+            measurement.card_hits += 1
+        else:
+            measurement.card_misses += 1
+
+
+def card_key(post, template_name, is_author):
+    return f'post-card:{template_name}:{post.cache_key}:{int(is_author)}'
+
+
+def render_card(post, template_name, user=None, render=None):
+    """HTML карточки из кэша; при промахе — ``render(контекст)`` или
+    render_to_string."""
+    if template_name not in CARD_TEMPLATES:
+        raise ValueError(f'Шаблон {template_name} не является карточкой')
+    is_author = user is not None and user.pk == post.author_id
+    key = card_key(post, template_name, is_author)
+    html = cache.get(key)
+    if html is not None:
+        _count(hit=True)
+        return mark_safe(html)
+    _count(hit=False)
+    values = {'post': post, 'user': user}
+    if render is None:
+        html = render_to_string(template_name, values)
+    else:
+        html = render(values)
+    cache.set(key, str(html), settings.POST_CARD_CACHE_TIMEOUT)
+    return mark_safe(html)
+
+
+def invalidate(post):
+    cache.delete_many([
+        card_key(post, template_name, is_author)
+        for template_name in CARD_TEMPLATES
+        for is_author in (False, True)
+    ])
+
+
+def stats():
+    hits, misses = _stats['hits'], _stats['misses']
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / total if total else 0.0,
+    }
+
+
+def reset_stats():
+    _stats['hits'] = _stats['misses'] = 0
@@ -0,0 +1,133 @@
+"""Денормализованные счётчики: посты авторов и групп, подписчики и
+подписки пользователей, комментарии постов."""
+from collections import Counter
+
+from django.db.models import Count, F, Value
+from django.db.models.functions import Greatest
+
+from .models import Group, Post, User, UserStats
+
+
+def _shift(field, delta):
+    # PositiveIntegerField: разошедшийся счётчик не должен ломать
+    # удаление поста ошибкой CHECK.
+    return {field: Greatest(F(field) + delta, Value(0))}
+
+
+def _add_user_stat(user_id, field, delta):
+    updated = UserStats.objects.filter(user_id=user_id).update(
+        **_shift(field, delta))
+    if not updated and delta > 0:
+        UserStats.objects.get_or_create(user_id=user_id)
+        UserStats.objects.filter(user_id=user_id).update(
+            **_shift(field, delta))
+
+
+def add_author_posts(author_id, delta):
+    _add_user_stat(author_id, 'posts_count', delta)
+
+
+def add_follow(user_id, author_id, delta):
+    _add_user_stat(author_id, 'followers_count', delta)
+    _add_user_stat(user_id, 'following_count', delta)
+
+
+def add_group_posts(group_id, delta):
+    Group.objects.filter(pk=group_id).update(**_shift('posts_count', delta))
+
+
+def add_post_comments(post_id, delta):
+    # Версия поста растёт (PostQuerySet.update), и карточки с прежним
+    # числом уходят из кэша; время изменения остаётся — текст не правили.
+    Post.objects.filter(pk=post_id).update(
+        updated_at=F('updated_at'), **_shift('comments_count', delta))
+
+
+def add_posts(posts, sign=1):
+    """Учесть сразу много постов (bulk_create, импорт)."""
+    authors = Counter(post.author_id for post in posts)
+    groups = Counter(post.group_id for post in posts
+                     if post.group_id is not None)
+    for author_id, number in authors.items():
+        add_author_posts(author_id, sign * number)
+    for group_id, number in groups.items():
+        add_group_posts(group_id, sign * number)
+
+
+def move_posts(posts, previous_groups):
+    """Учесть смену группы у многих постов (PostQuerySet.update)."""
+    deltas = Counter()
+    for post in posts:
+        previous_group_id, _ = previous_groups[post.pk]
+        if previous_group_id == post.group_id:
+            continue
+        if previous_group_id is not None:
+            deltas[previous_group_id] -= 1
+        if post.group_id is not None:
+            deltas[post.group_id] += 1
+    for group_id, delta in deltas.items():
+        if delta:
+            add_group_posts(group_id, delta)
+
+
+def author_stats(user):
+    """Счётчики пользователя; нулевые, если строки ещё нет."""
+    try:
+        return user.stats
+    except UserStats.DoesNotExist:
+        return UserStats(user_id=user.pk)
+
+
+USER_STATS_FIELDS = ('posts_count', 'followers_count', 'following_count')
+
+
+def _actual_user_stats():
+    counts = {
+        'posts_count': Count('posts'),
+        'followers_count': Count('following'),
+        'following_count': Count('follower'),
+    }
+    actual = {}
+    # По запросу на счётчик: несколько Count по разным связям в одном
+    # запросе перемножили бы строки.
+    for field, count in counts.items():
+        for user_id, value in (User.objects.annotate(value=count)
+                               .values_list('pk', 'value')):
+            actual.setdefault(user_id, {})[field] = value
+    return actual
+
+
+def find_drift():
+    """Счётчики, расходящиеся с фактическими числами.
+
+    Возвращает список ``(модель, pk, сохранено, на самом деле)``, где
+    сохранённое и фактическое — словари ``{поле: значение}`` (сохранено —
+    None, если строки счётчиков нет).
+    """
+    drift = []
+    for group in Group.objects.annotate(actual=Count('posts')):
+        if group.posts_count != group.actual:
+            drift.append((Group, group.pk, {'posts_count': group.posts_count},
+                          {'posts_count': group.actual}))
+    stored = {
+        row['user_id']: {field: row[field] for field in USER_STATS_FIELDS}
+        for row in UserStats.objects.values('user_id', *USER_STATS_FIELDS)
+    }
+    for user_id, actual in _actual_user_stats().items():
+        if stored.get(user_id) != actual:
+            drift.append((UserStats, user_id, stored.get(user_id), actual))
+    posts = (Post.objects.annotate(actual=Count('comments'))
+             .exclude(comments_count=F('actual'))
+             .values_list('pk', 'comments_count', 'actual'))
+    for pk, comments_count, actual in posts:
+        drift.append((Post, pk, {'comments_count': comments_count},
+                      {'comments_count': actual}))
+    return drift
+
+
+def repair(drift):
+    for model, pk, stored, actual in drift:
+        if model is UserStats:
+            UserStats.objects.update_or_create(user_id=pk, defaults=actual)
+        else:
+            model.objects.filter(pk=pk).update(**actual)
@@ -0,0 +1,88 @@
+"""Потоковая выгрузка постов в JSONL и CSV.
+
+Строки читаются из базы порциями (``iterator(chunk_size=...)``) и сразу
+превращаются в текст, поэтому память не растёт вместе с таблицей. Поля
+совпадают с форматом ``manage.py import_posts``.
+"""
+import csv
+import json
+from datetime import datetime, time
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Post
+
+FORMATS = ('jsonl', 'csv')
+FIELDS = ('id', 'text', 'author', 'group', 'pub_date')
+CONTENT_TYPES = {
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+CHUNK_SIZE = 2000
+
+
+def parse_moment(value):
+    """Дата или дата-время из строки; ValueError, если не разобрать."""
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f'Неверная дата: {value}')
+        moment = datetime.combine(day, time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment, timezone.utc)
+    return moment
+
+
+def export_rows(author=None, group=None, since=None, until=None):
+    """Посты для выгрузки в порядке id: ``since`` включительно,
+    ``until`` — нет."""
+    posts = Post.objects.order_by('pk')
+    if author:
+        posts = posts.filter(author__username=author)
+    if group:
+        posts = posts.filter(group__slug=group)
+    if since:
+        posts = posts.filter(pub_date__gte=parse_moment(since))
+    if until:
+        posts = posts.filter(pub_date__lt=parse_moment(until))
+    return posts.values_list('pk', 'text', 'author__username',
+                             'group__slug', 'pub_date')
+
+
+def _records(rows, chunk_size):
+    for pk, text, author, group, pub_date in rows.iterator(
+            chunk_size=chunk_size):
+        yield {
+            'id': pk,
+            'text': text,
+            'author': author,
+            'group': group or '',
+            'pub_date': pub_date.isoformat(),
+        }
+
+
+def iter_jsonl(rows, chunk_size=CHUNK_SIZE):
+    for record in _records(rows, chunk_size):
+        yield json.dumps(record, ensure_ascii=False) + '\n'
+
+
+class _Echo:
+    """Псевдофайл для csv.writer: возвращает строку вместо записи."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(rows, chunk_size=CHUNK_SIZE):
+    writer = csv.DictWriter(_Echo(), fieldnames=FIELDS)
+    yield writer.writeheader()
+    for record in _records(rows, chunk_size):
+        yield writer.writerow(record)
+
+
+def iter_export(rows, export_format, chunk_size=CHUNK_SIZE):
+    if export_format == 'csv':
+        return iter_csv(rows, chunk_size)
+    return iter_jsonl(rows, chunk_size)
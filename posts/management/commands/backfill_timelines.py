@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import timelines
+
+
+class Command(BaseCommand):
+    help = ('Заполняет материализованные ленты групп и авторов '
+            '(FEED_TIMELINES) по таблице постов.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=2000,
+            help='Сколько строк лент вставлять за раз.',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть положительным.')
+        created = timelines.rebuild(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Строк в лентах: {created}'
+        ))
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from posts.models import Post, Group, User
+from yatube.settings import PAGINATE_BY
+
+# Признак того, что SQLite сортирует выборку сам, а не идёт по индексу.
+SORT_MARKER = 'USE TEMP B-TREE'
+
+
+class Command(BaseCommand):
+    help = 'Печатает план выполнения (EXPLAIN QUERY PLAN) запросов лент.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Завершиться с ошибкой, если какая-то лента '
+                 'сортируется без индекса (только SQLite).',
+        )
+
+    def feed_querysets(self):
+        # Для плана содержимое таблиц не важно: берём любые существующие
+        # id, а на пустой базе — заведомо несуществующие.
+        group_id = Group.objects.values_list('pk', flat=True).first() or 0
+        author_id = User.objects.values_list('pk', flat=True).first() or 0
+        feeds = {
+            'index': Post.objects.for_feed(),
+            'group_posts': Post.objects.for_feed().filter(group_id=group_id),
+            'profile': Post.objects.for_feed().filter(author_id=author_id),
+        }
+        for name, queryset in feeds.items():
+            yield name, queryset[:PAGINATE_BY]
+            yield (f'{name} (cursor)',
+                   queryset.order_by('-pub_date', '-pk')[:PAGINATE_BY + 1])
+
+    def handle(self, *args, **options):
+        unindexed = []
+        for name, queryset in self.feed_querysets():
+            plan = queryset.explain()
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(str(queryset.query))
+            self.stdout.write(plan)
+            self.stdout.write('')
+            if SORT_MARKER in plan:
+                unindexed.append(name)
+
+        if options['check'] and connection.vendor == 'sqlite':
+            if unindexed:
+                raise CommandError(
+                    'Сортировка без индекса: ' + ', '.join(unindexed)
+                )
+            self.stdout.write(self.style.SUCCESS(
+                'Все ленты сортируются по индексу.'
+            ))
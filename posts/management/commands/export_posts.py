@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import export
+
+
+class Command(BaseCommand):
+    help = 'Выгружает посты в JSONL или CSV, не загружая таблицу в память.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format', choices=export.FORMATS, default='jsonl',
+        )
+        parser.add_argument(
+            '--output', '-o',
+            help='Файл для выгрузки; по умолчанию — stdout.',
+        )
+        parser.add_argument('--author', help='username автора.')
+        parser.add_argument('--group', help='slug группы.')
+        parser.add_argument(
+            '--since', help='Не раньше этой даты (ISO 8601).',
+        )
+        parser.add_argument(
+            '--until', help='Раньше этой даты (ISO 8601).',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=export.CHUNK_SIZE,
+            help='Сколько строк читать из базы за раз.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            rows = export.export_rows(
+                author=options['author'],
+                group=options['group'],
+                since=options['since'],
+                until=options['until'],
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        chunks = export.iter_export(rows, options['format'],
+                                    options['chunk_size'])
+        if options['output']:
+            newline = '' if options['format'] == 'csv' else None
+            with open(options['output'], 'w', encoding='utf-8',
+                      newline=newline) as target:
+                target.writelines(chunks)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
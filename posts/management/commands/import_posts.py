@@ -0,0 +1,155 @@
+import csv
+import json
+import time
+from contextlib import contextmanager
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts.models import Post, Group, User
+
+
+@contextmanager
+def keep_pub_date():
+    """Не затирать pub_date из файла текущим временем (auto_now_add)."""
+    field = Post._meta.get_field('pub_date')
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+class LookupCache:
+    """Сопоставление имён с id, запрашиваемое пачками и запоминаемое
+    на всё время импорта (в том числе отсутствующие имена)."""
+
+    def __init__(self, queryset, field):
+        self.queryset = queryset
+        self.field = field
+        self.ids = {}
+
+    def resolve(self, names):
+        missing = {name for name in names if name not in self.ids}
+        if missing:
+            found = dict(
+                self.queryset.filter(**{f'{self.field}__in': missing})
+                .values_list(self.field, 'pk')
+            )
+            for name in missing:
+                self.ids[name] = found.get(name)
+
+    def __getitem__(self, name):
+        return self.ids.get(name)
+
+
+class Command(BaseCommand):
+    help = ('Импортирует посты из JSONL или CSV с полями text, author '
+            '(username), group (slug, необязательно) и pub_date '
+            '(ISO 8601, необязательно).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл с постами.')
+        parser.add_argument(
+            '--format', choices=('jsonl', 'csv'),
+            help='Формат файла; по умолчанию — по расширению.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько постов вставлять одной транзакцией.',
+        )
+
+    def read_rows(self, path, file_format):
+        with open(path, encoding='utf-8', newline='') as source:
+            if file_format == 'csv':
+                yield from csv.DictReader(source)
+                return
+            for number, line in enumerate(source, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError as error:
+                    raise CommandError(f'Строка {number}: {error}')
+
+    @staticmethod
+    def is_well_formed(row):
+        """Строка — объект со строковыми полями; иначе она пропускается,
+        как и строка с неизвестным автором."""
+        if not isinstance(row, dict):
+            return False
+        return (isinstance(row.get('text'), str)
+                and isinstance(row.get('author'), str)
+                and all(isinstance(row.get(field) or '', str)
+                        for field in ('group', 'pub_date')))
+
+    @staticmethod
+    def parse_pub_date(value):
+        try:
+            return parse_datetime(value)
+        except ValueError:
+            # Верный формат, но несуществующая дата: 2020-13-45.
+            return None
+
+    def build_posts(self, rows, authors, groups):
+        rows = [row for row in rows if self.is_well_formed(row)]
+        authors.resolve(row['author'] for row in rows)
+        groups.resolve(row['group'] for row in rows if row.get('group'))
+        posts = []
+        now = timezone.now()
+        for row in rows:
+            author_id = authors[row['author']]
+            group_id = groups[row['group']] if row.get('group') else None
+            if (not row['text'] or author_id is None
+                    or (row.get('group') and group_id is None)):
+                continue
+            pub_date = now
+            if row.get('pub_date'):
+                pub_date = self.parse_pub_date(row['pub_date'])
+                if pub_date is None:
+                    continue
+                if timezone.is_naive(pub_date):
+                    pub_date = timezone.make_aware(pub_date, timezone.utc)
+            posts.append(Post(text=row['text'], author_id=author_id,
+                              group_id=group_id, pub_date=pub_date))
+        return posts
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or (
+            'csv' if path.lower().endswith('.csv') else 'jsonl'
+        )
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size должен быть положительным.')
+        try:
+            rows = self.read_rows(path, file_format)
+            authors = LookupCache(User.objects.all(), 'username')
+            groups = LookupCache(Group.objects.all(), 'slug')
+            imported = skipped = 0
+            started = time.monotonic()
+            with keep_pub_date():
+                while True:
+                    batch = list(islice(rows, batch_size))
+                    if not batch:
+                        break
+                    posts = self.build_posts(batch, authors, groups)
+                    # bulk_create сам открывает транзакцию и обновляет
+                    # счётчики постов (posts.signals).
+                    Post.objects.bulk_create(posts)
+                    imported += len(posts)
+                    skipped += len(batch) - len(posts)
+                    if options['verbosity'] > 1:
+                        self.report(imported, skipped, started)
+        except OSError as error:
+            raise CommandError(error)
+        self.report(imported, skipped, started, style=self.style.SUCCESS)
+
+    def report(self, imported, skipped, started, style=str):
+        elapsed = max(time.monotonic() - started, 1e-9)
+        self.stdout.write(style(
+            f'Импортировано: {imported}, пропущено: {skipped}, '
+            f'{elapsed:.1f} с, {imported / elapsed:.0f} строк/с'
+        ))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from posts import counters
+
+
+class Command(BaseCommand):
+    help = ('Сверяет счётчики постов, подписок и комментариев с базой '
+            'и исправляет расхождения.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать расхождения, ничего не менять.',
+        )
+
+    def handle(self, *args, **options):
+        drift = counters.find_drift()
+        for model, pk, stored, actual in drift:
+            self.stdout.write(
+                f'{model.__name__} {pk}: {stored} -> {actual}'
+            )
+        if not drift:
+            self.stdout.write(self.style.SUCCESS('Расхождений нет.'))
+            return
+        if options['dry_run']:
+            self.stdout.write(f'Расхождений: {len(drift)}')
+            return
+        counters.repair(drift)
+        self.stdout.write(self.style.SUCCESS(
+            f'Исправлено счётчиков: {len(drift)}'
+        ))
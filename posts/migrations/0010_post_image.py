@@ -0,0 +1,20 @@
+# Generated by Django 3.1.14 on 2026-10-18 04:50
+
+from django.db import migrations
+import posts.uploads
+import sorl.thumbnail.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0009_follow'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image',
+            field=sorl.thumbnail.fields.ImageField(blank=True, null=True, storage=posts.uploads.ContentAddressedStorage(), upload_to=posts.uploads.image_path, verbose_name='Картинка'),
+        ),
+    ]
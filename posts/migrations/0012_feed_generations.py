@@ -0,0 +1,21 @@
+# Generated by Django 3.1.14 on 2026-10-18 05:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_comments'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedGeneration',
+            fields=[
+                ('feed', models.CharField(max_length=200, primary_key=True, serialize=False)),
+                ('generation', models.PositiveBigIntegerField()),
+                ('changed', models.DateTimeField()),
+            ],
+        ),
+    ]
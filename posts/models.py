@@ -1,23 +1,125 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import connections, models, transaction
+from django.dispatch import Signal
+from django.utils import timezone
+from sorl.thumbnail import ImageField
+
+from .uploads import ContentAddressedStorage, image_path
 
 User = get_user_model()
 
+# bulk_create не отправляет post_save; этот сигнал получает список
+# созданных постов, чтобы счётчики и кэши не отставали (posts.signals).
+posts_bulk_created = Signal()
+# То же для PostQuerySet.update, меняющего текст или группу: получатели
+# получают посты после правки и прежние группы {id поста: (id, slug)}.
+posts_bulk_updated = Signal()
+
+# Посты, удаляемые текущим вызовом delete(): комментарии, уходящие с ними
+# каскадом, счётчики не пересчитывают (posts.signals). Набор живёт только
+# до выхода из delete(), так что откат удаления не оставляет меток.
+deleting_posts = ContextVar('deleting_posts', default=None)
+
+
+@contextmanager
+def _deleting():
+    token = deleting_posts.set(set())
+    try:
+        yield
+    finally:
+        deleting_posts.reset(token)
+
 
 class Group(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique=True)
     description = models.TextField()
+    posts_count = models.PositiveIntegerField(default=0, editable=False)
     verbose_name = 'Группа'
 
     def __str__(self):
         return self.title
 
 
+class PostQuerySet(models.QuerySet):
+    FEED_FIELDS = (
+        'text', 'pub_date', 'updated_at', 'version', 'image',
+        'comments_count', 'author_id', 'group_id',
+        'author__username', 'author__first_name', 'author__last_name',
+        'group__title', 'group__slug',
+    )
+
+    def for_feed(self):
+        """Посты для лент: автор и группа одним запросом, без лишних
+        столбцов."""
+        return self.select_related('author', 'group').only(*self.FEED_FIELDS)
+
+    # Поля, от которых зависят счётчики групп, ленты и поиск.
+    TRACKED_FIELDS = {'text', 'group', 'group_id'}
+
+    def update(self, **kwargs):
+        """Массовая правка тоже увеличивает версию и время изменения,
+        а смена текста или группы доходит до сигналов, как при save."""
+        if {'author', 'author_id'}.intersection(kwargs):
+            raise ValueError('Автора постов массово не меняют')
+        kwargs.setdefault('version', models.F('version') + 1)
+        kwargs.setdefault('updated_at', timezone.now())
+        if not self.TRACKED_FIELDS.intersection(kwargs):
+            return super().update(**kwargs)
+        with transaction.atomic(using=self.db):
+            previous_groups = {
+                pk: (group_id, slug) for pk, group_id, slug in
+                self.values_list('pk', 'group_id', 'group__slug')
+            }
+            updated = super().update(**kwargs)
+            # После правки посты могут уже не подходить под фильтр.
+            posts = list(self.model.objects.using(self.db)
+                         .select_related('author', 'group')
+                         .filter(pk__in=previous_groups))
+            posts_bulk_updated.send(sender=self.model, posts=posts,
+                                    previous_groups=previous_groups,
+                                    fields=set(kwargs))
+        return updated
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        features = connections[self.db].features
+        with transaction.atomic(using=self.db):
+            last_pk = None
+            if not features.can_return_rows_from_bulk_insert:
+                last_pk = self.aggregate(last=models.Max('pk'))['last'] or 0
+            objs = super().bulk_create(objs, *args, **kwargs)
+            if last_pk is not None:
+                # SQLite не возвращает id вставленных строк, а получателям
+                # сигнала они нужны. Внутри транзакции запись в базу
+                # монопольна, так что новые id идут подряд после last_pk.
+                new_pks = (self.filter(pk__gt=last_pk).order_by('pk')
+                           .values_list('pk', flat=True))
+                for obj, pk in zip(objs, new_pks):
+                    obj.pk = pk
+                    obj._state.adding = False
+            posts_bulk_created.send(sender=self.model, posts=objs)
+        return objs
+
+    def delete(self):
+        with _deleting():
+            return super().delete()
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
 class Post(models.Model):
     text = models.TextField(verbose_name='Текст',
                             help_text='Напишите ваш пост')
     pub_date = models.DateTimeField('date published', auto_now_add=True)
+    updated_at = models.DateTimeField('Дата изменения', auto_now=True)
+    # Растёт при каждом сохранении и массовой правке (PostQuerySet.update):
+    # входит в cache_key — ключ кэша всего, что показывает пост.
+    version = models.PositiveIntegerField(default=1, editable=False)
     author = models.ForeignKey(User,
                                on_delete=models.CASCADE,
                                related_name='posts')
@@ -25,9 +127,171 @@ class Post(models.Model):
                               on_delete=models.SET_NULL,
                               blank=True, null=True, related_name='posts',
                               help_text='Укажите группу')
+    # Миниатюры для карточек создаются в фоне (posts.thumbnails).
+    image = ImageField(verbose_name='Картинка', upload_to=image_path,
+                       storage=ContentAddressedStorage(),
+                       blank=True, null=True)
+    # Число комментариев для карточек лент (posts.counters).
+    comments_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         ordering = ['-pub_date']
+        # Ленты фильтруют по автору или группе и сортируют по дате:
+        # без составных индексов SQLite сортирует выборку во временном
+        # B-дереве на каждый запрос. id в конце покрывает keyset-порядок
+        # (pub_date, id) из posts.paginators.
+        indexes = [
+            models.Index(fields=['-pub_date', '-id'],
+                         name='post_pub_date_idx'),
+            models.Index(fields=['author', '-pub_date', '-id'],
+                         name='post_author_pub_date_idx'),
+            models.Index(fields=['group', '-pub_date', '-id'],
+                         name='post_group_pub_date_idx'),
+        ]
+
+    def __str__(self):
+        return self.text[:15]
+
+    @property
+    def cache_key(self):
+        # Дата публикации отличает пост от нового, получившего id
+        # удалённого (SQLite переиспользует id).
+        return f'{self.pk}.{self.version}.{self.pub_date.timestamp()}'
+
+    def save(self, *args, **kwargs):
+        bump_version = not self._state.adding
+        if bump_version:
+            # Увеличение в самом UPDATE: две одновременные правки не
+            # получат одну и ту же версию.
+            self.version = models.F('version') + 1
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'version',
+                                           'updated_at'}
+        # Сигналы post_save пересчитывают счётчики постов; они должны
+        # попасть в ту же транзакцию, что и сам пост.
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+            if bump_version:
+                self.refresh_from_db(using=self._state.db,
+                                     fields=['version'])
+
+    def delete(self, *args, **kwargs):
+        with _deleting():
+            return super().delete(*args, **kwargs)
+
+
+class Comment(models.Model):
+    post = models.ForeignKey(Post,
+                             on_delete=models.CASCADE,
+                             related_name='comments')
+    author = models.ForeignKey(User,
+                               on_delete=models.CASCADE,
+                               related_name='comments')
+    text = models.TextField(verbose_name='Комментарий',
+                            help_text='Напишите комментарий')
+    created = models.DateTimeField('Дата комментария', auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created']
+        # Страница комментариев — keyset-срез этого индекса
+        # (posts.paginators.CursorPaginator по created).
+        indexes = [
+            models.Index(fields=['post', '-created', '-id'],
+                         name='comment_post_created_idx'),
+        ]
 
     def __str__(self):
         return self.text[:15]
+
+
+class UserStats(models.Model):
+    """Денормализованные счётчики пользователя.
+
+    Обновляются сигналами вместе с постами (posts.signals); расхождения
+    исправляет ``manage.py recount_posts``.
+    """
+    user = models.OneToOneField(User,
+                                on_delete=models.CASCADE,
+                                primary_key=True,
+                                related_name='stats')
+    posts_count = models.PositiveIntegerField(default=0)
+    followers_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.user_id}: {self.posts_count}'
+
+
+class Follow(models.Model):
+    user = models.ForeignKey(User,
+                             on_delete=models.CASCADE,
+                             related_name='follower')
+    author = models.ForeignKey(User,
+                               on_delete=models.CASCADE,
+                               related_name='following')
+
+    class Meta:
+        constraints = [
+            # Индекс ограничения отдаёт подписки пользователя без
+            # обращения к таблице (posts.paginators.FanInPaginator).
+            models.UniqueConstraint(fields=['user', 'author'],
+                                    name='follow_unique'),
+            models.CheckConstraint(check=~models.Q(user=models.F('author')),
+                                   name='follow_not_self'),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id} -> {self.author_id}'
+
+
+class TimelineEntry(models.Model):
+    """Пост в материализованной ленте группы или автора.
+
+    Ведётся только при ``FEED_TIMELINES`` (posts.timelines); после
+    включения ленты заполняет ``manage.py backfill_timelines``.
+    """
+    GROUP = 'group'
+    AUTHOR = 'author'
+    OWNER_TYPES = (
+        (GROUP, 'Группа'),
+        (AUTHOR, 'Автор'),
+    )
+
+    owner_type = models.CharField(max_length=6, choices=OWNER_TYPES)
+    owner_id = models.PositiveIntegerField()
+    post = models.ForeignKey(Post,
+                             on_delete=models.CASCADE,
+                             related_name='timeline_entries')
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['owner_type', 'owner_id', 'post'],
+                name='timeline_entry_unique',
+            ),
+        ]
+        # Страница ленты — срез этого индекса, сколько бы постов ни было
+        # в остальных лентах.
+        indexes = [
+            models.Index(fields=['owner_type', 'owner_id', '-pub_date',
+                                 '-post'],
+                         name='timeline_owner_pub_date_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.owner_type} {self.owner_id}: {self.post_id}'
+
+
+class FeedGeneration(models.Model):
+    """Поколение ленты (posts.page_cache): ключи закэшированных страниц
+    и ETag. Хранится в базе, чтобы все процессы видели одно значение."""
+    feed = models.CharField(max_length=200, primary_key=True)
+    generation = models.PositiveBigIntegerField()
+    changed = models.DateTimeField()
+
+    def __str__(self):
+        return f'{self.feed}: {self.generation}'
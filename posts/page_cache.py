@@ -0,0 +1,168 @@
+"""Кэш целых страниц лент для анонимных посетителей.
+
+У каждой ленты (главная, группа, автор) есть счётчик поколений — строка
+FeedGeneration в базе, общая для всех процессов. Ключ страницы включает
+URL и поколения её лент, поэтому сбросить все закэшированные страницы
+ленты — значит увеличить её счётчик: старые ключи больше не
+запрашиваются и вытесняются сами. Счётчики увеличивают сигналы
+сохранения и удаления постов (posts.signals) в той же транзакции, так
+что новый пост в группе не трогает кэш чужих групп и профилей.
+
+Те же счётчики дают ETag для условных GET (``conditional_feed_page``):
+повторный запрос неизменившейся ленты получает 304 после одного запроса
+к базе по первичному ключу, без рендеринга шаблонов.
+"""
+import math
+import time
+from datetime import datetime, timedelta
+from functools import wraps
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+from django.views.decorators.http import condition
+
+from yatube.routers import PRIMARY, replica_reads
+from .models import FeedGeneration
+
+INDEX_FEED = 'index'
+
+
+def group_feed(slug):
+    return f'group:{slug}'
+
+
+def author_feed(username):
+    return f'author:{username}'
+
+
+def post_feeds(post):
+    """Ленты, на страницах которых виден пост."""
+    feeds = {INDEX_FEED, author_feed(post.author.username)}
+    if post.group_id is not None:
+        feeds.add(group_feed(post.group.slug))
+    return feeds
+
+
+def _initial_generation():
+    # Если таблицу очистят, новый счётчик не должен совпасть со старым,
+    # иначе снова станут видны страницы прошлых поколений из кэша.
+    return int(time.time() * 1000)
+
+
+def feed_state(request, feeds):
+    """Поколения и время изменения лент: один запрос на HTTP-запрос,
+    его делят ETag и кэш страницы."""
+    feeds = tuple(feeds)
+    states = request.__dict__.setdefault('_feed_state', {})
+    if feeds not in states:
+        states[feeds] = {
+            feed: (generation, changed)
+            for feed, generation, changed in
+            FeedGeneration.objects.filter(feed__in=feeds)
+            .values_list('feed', 'generation', 'changed')
+        }
+    return states[feeds]
+
+
+def get_generations(request, feeds):
+    state = feed_state(request, feeds)
+    # Ленту без строки ещё не меняли: её поколение нулевое.
+    return [state.get(feed, (0, None))[0] for feed in feeds]
+
+
+def bump(*feeds):
+    feeds = set(feeds)
+    now = timezone.now()
+    updated = FeedGeneration.objects.filter(feed__in=feeds).update(
+        generation=F('generation') + 1, changed=now)
+    if updated < len(feeds):
+        # Существующие строки уже увеличены, конфликт их не тронет.
+        FeedGeneration.objects.bulk_create(
+            [FeedGeneration(feed=feed, generation=_initial_generation(),
+                            changed=now) for feed in feeds],
+            ignore_conflicts=True,
+        )
+
+
+def last_modified(request, feeds):
+    """Время последнего изменения лент или None, если хотя бы для одной
+    оно не записано."""
+    state = feed_state(request, feeds)
+    if len(state) < len(set(feeds)):
+        return None
+    # Last-Modified точен до секунды: округление вверх не даёт изменению
+    # в ту же секунду спрятаться за 304.
+    changed = max(changed for _, changed in state.values())
+    return datetime.fromtimestamp(math.ceil(changed.timestamp()),
+                                  timezone.utc)
+
+
+def replica_may_lag(feeds):
+    """Страница прочитана с реплики, а ленты менялись последние
+    ``REPLICA_PIN_SECONDS`` секунд: реплика могла ещё не получить
+    изменения, и такую страницу не кэшируют. Время изменения берётся
+    из основной базы — реплика о свежей записи не знает."""
+    if replica_reads.get() is None:
+        return False
+    since = timezone.now() - timedelta(seconds=settings.REPLICA_PIN_SECONDS)
+    return (FeedGeneration.objects.using(PRIMARY)
+            .filter(feed__in=feeds, changed__gt=since).exists())
+
+
+def page_key(request, generations):
+    path = md5(request.get_full_path().encode()).hexdigest()
+    return f'feed-page:{path}:' + '.'.join(map(str, generations))
+
+
+def cache_feed_page(feeds):
+    """Кэширует ответ view для анонимных GET-запросов.
+
+    ``feeds`` получает именованные аргументы view и возвращает ленты,
+    от которых зависит страница.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            timeout = settings.FEED_PAGE_CACHE_TIMEOUT
+            if (not timeout or request.method != 'GET'
+                    or request.user.is_authenticated):
+                return view(request, *args, **kwargs)
+            page_feeds = feeds(**kwargs)
+            key = page_key(request, get_generations(request, page_feeds))
+            response = cache.get(key)
+            if response is None:
+                response = view(request, *args, **kwargs)
+                if (response.status_code == 200
+                        and not replica_may_lag(page_feeds)):
+                    cache.set(key, response, timeout)
+            return response
+        return wrapper
+    return decorator
+
+
+def conditional_feed_page(feeds):
+    """Условный GET для view ленты: ETag и Last-Modified из счётчиков
+    поколений.
+
+    Страница зависит и от посетителя (меню, ссылки на редактирование),
+    поэтому ETag включает id пользователя, а Last-Modified отдаётся только
+    анонимам. Формы страницы несут CSRF-токен, который меняется при входе:
+    ETag включает и cookie CSRF, иначе после повторного входа браузер
+    получил бы 304 и отправлял формы с устаревшим токеном.
+    """
+    def etag(request, *args, **kwargs):
+        generations = get_generations(request, feeds(**kwargs))
+        csrf = request.META.get('CSRF_COOKIE', '')
+        raw = (f'{request.get_full_path()}|{request.user.pk or 0}|{csrf}|'
+               + '.'.join(map(str, generations)))
+        return md5(raw.encode()).hexdigest()
+
+    def modified(request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return None
+        return last_modified(request, feeds(**kwargs))
+
+    return condition(etag_func=etag, last_modified_func=modified)
@@ -0,0 +1,232 @@
+import binascii
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.core.paginator import Paginator
+from django.db.models import OuterRef, Q, Subquery
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+FORWARD = 'n'
+BACKWARD = 'p'
+
+# Навигация по номерам страниц: сколько ссылок показывать по краям и
+# вокруг текущей страницы; пропуск между ними обозначается ELLIPSIS.
+PAGE_WINDOW_ENDS = 1
+PAGE_WINDOW_EACH_SIDE = 2
+ELLIPSIS = None
+
+# Наибольший id, который примет база (знаковое 64-битное целое): курсор
+# с большим id — битый, а не ошибка сервера.
+MAX_PK = 2 ** 63 - 1
+
+
+def ordering(direction, date_field='pub_date'):
+    if direction == FORWARD:
+        return f'-{date_field}', '-pk'
+    return date_field, 'pk'
+
+
+def beyond(position, date_field='pub_date'):
+    """Условие «запись дальше ключа» в направлении обхода."""
+    direction, date, pk = position
+    lookup = 'lt' if direction == FORWARD else 'gt'
+    return (Q(**{f'{date_field}__{lookup}': date})
+            | Q(**{date_field: date, f'pk__{lookup}': pk}))
+
+
+class CursorPage:
+    """Страница ленты без номера: знает только соседей."""
+
+    is_cursor = True
+
+    def __init__(self, object_list, paginator, next_cursor=None,
+                 previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self)} items>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Keyset-паджинатор по (дата, id), от новых записей к старым.
+
+    Не выполняет COUNT(*) и не сдвигается через OFFSET: каждая страница —
+    это выборка ``LIMIT per_page + 1`` от ключа крайней записи соседней
+    страницы, поэтому глубокие страницы стоят столько же, сколько первая.
+    ``date_field`` — поле даты записей (у постов ``pub_date``).
+    """
+
+    def __init__(self, object_list, per_page, date_field='pub_date'):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.date_field = date_field
+
+    def encode_cursor(self, direction, post):
+        date = getattr(post, self.date_field)
+        raw = f'{direction}|{date.isoformat()}|{post.pk}'
+        # Без «=» в конце: курсор попадает в URL как есть.
+        return urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """Вернуть (direction, pub_date, pk) или None для пустого
+        и битого курсора."""
+        try:
+            padding = '=' * (-len(cursor) % 4)
+            raw = urlsafe_b64decode((cursor + padding).encode()).decode()
+            direction, pub_date, pk = raw.split('|')
+            pub_date = parse_datetime(pub_date)
+            pk = int(pk)
+        except (binascii.Error, UnicodeError, ValueError):
+            return None
+        if (direction not in (FORWARD, BACKWARD) or pub_date is None
+                or not 0 < pk <= MAX_PK):
+            return None
+        if timezone.is_naive(pub_date):
+            pub_date = timezone.make_aware(pub_date, timezone.utc)
+        return direction, pub_date, pk
+
+    def page(self, cursor=None):
+        position = self.decode_cursor(cursor) if cursor else None
+        direction = position[0] if position else FORWARD
+        posts = self.fetch(position, direction, self.per_page + 1)
+        has_more = len(posts) > self.per_page
+        posts = posts[:self.per_page]
+        if direction == BACKWARD:
+            return self._page(posts[::-1], True, has_more)
+        return self._page(posts, has_more, position is not None)
+
+    def fetch(self, position, direction, limit):
+        """До ``limit`` постов за ключом ``position`` в порядке обхода
+        ``direction``."""
+        posts = self.object_list
+        if position is not None:
+            posts = posts.filter(beyond(position, self.date_field))
+        return list(posts.order_by(*ordering(direction, self.date_field))
+                    [:limit])
+
+    def get_page(self, cursor=None):
+        """Как ``Paginator.get_page``: битый курсор даёт первую страницу."""
+        return self.page(cursor)
+
+    def _page(self, posts, has_next, has_previous):
+        next_cursor = previous_cursor = None
+        if posts and has_next:
+            next_cursor = self.encode_cursor(FORWARD, posts[-1])
+        if posts and has_previous:
+            previous_cursor = self.encode_cursor(BACKWARD, posts[0])
+        return CursorPage(posts, self, next_cursor, previous_cursor)
+
+
+class FanInPaginator(CursorPaginator):
+    """Keyset-лента из постов многих авторов (лента подписок).
+
+    Работа на страницу не зависит от числа постов в базе:
+
+    1. для каждого автора берётся его ближайший за курсором пост — один
+       шаг по индексу (author, -pub_date, -id);
+    2. в страницу из ``limit`` постов попадают только авторы с ``limit``
+       лучшими такими «головами»: у остальных каждый пост уступает хотя
+       бы ``limit`` чужим головам;
+    3. у этих авторов берётся до ``limit`` постов — снова по индексу, —
+       и списки сливаются одним запросом.
+
+    ``authors`` — QuerySet пользователей, чьи посты составляют ленту.
+    """
+
+    def __init__(self, object_list, authors, per_page):
+        super().__init__(object_list, per_page)
+        self.authors = authors
+
+    def own_posts(self, author, position, order):
+        posts = self.object_list.model._base_manager.filter(author_id=author)
+        if position is not None:
+            posts = posts.filter(beyond(position))
+        return posts.order_by(*order)
+
+    def fetch(self, position, direction, limit):
+        order = ordering(direction)
+        head = self.own_posts(OuterRef('pk'), position, order)
+        heads = [
+            (pub_date, pk, author_id)
+            for author_id, pub_date, pk in self.authors.annotate(
+                head_date=Subquery(head.values('pub_date')[:1]),
+                head_pk=Subquery(head.values('pk')[:1]),
+            ).filter(head_pk__isnull=False)
+            .values_list('pk', 'head_date', 'head_pk')
+        ]
+        heads.sort(reverse=direction == FORWARD)
+        candidates = Q()
+        for _, _, author_id in heads[:limit]:
+            candidates |= Q(pk__in=self.own_posts(
+                author_id, position, order).values('pk')[:limit])
+        if not candidates:
+            return []
+        return list(self.object_list.filter(candidates)
+                    .order_by(*order)[:limit])
+
+
+def page_window(number, num_pages, on_each_side=PAGE_WINDOW_EACH_SIDE,
+                on_ends=PAGE_WINDOW_ENDS):
+    """Номера страниц для навигации вместо всего ``page_range``.
+
+    Первые и последние ``on_ends`` страниц и ``on_each_side`` страниц
+    вокруг текущей; пропуск между ними — ``ELLIPSIS``. Пропуск ровно
+    в одну страницу заменяется самой страницей.
+    """
+    window = range(max(number - on_each_side, 1),
+                   min(number + on_each_side, num_pages) + 1)
+    numbers = sorted(
+        set(range(1, min(on_ends, num_pages) + 1))
+        | set(window)
+        | set(range(max(num_pages - on_ends + 1, 1), num_pages + 1))
+    )
+    result = []
+    for number in numbers:
+        if result:
+            gap = number - result[-1]
+            if gap == 2:
+                result.append(number - 1)
+            elif gap > 2:
+                result.append(ELLIPSIS)
+        result.append(number)
+    return result
+
+
+def get_page(request, object_list, per_page, count=None):
+    """Страница ленты по параметрам запроса.
+
+    ``?cursor=`` включает keyset-паджинацию, иначе — обычный ``?page=``.
+    Если число объектов уже известно (``count``, например из
+    денормализованного счётчика), паджинатор не выполняет COUNT(*).
+    """
+    if 'cursor' in request.GET:
+        paginator = CursorPaginator(object_list, per_page)
+        return paginator.get_page(request.GET['cursor'])
+    paginator = Paginator(object_list, per_page)
+    if count is not None:
+        # Paginator.count — cached_property: значение экземпляра
+        # подменяет вычисление.
+        paginator.count = count
+    return paginator.get_page(request.GET.get('page'))
@@ -0,0 +1,93 @@
+"""Полнотекстовый поиск по постам.
+
+В SQLite текст постов дублируется в виртуальную таблицу FTS5
+(миграция 0006). Индекс обновляют сигналы сохранения, удаления и
+массовой вставки постов (posts.signals); ``manage.py
+rebuild_search_index`` собирает его заново. На других СУБД поиск
+откатывается к ``icontains``.
+"""
+import re
+
+from django.db import connection
+
+from .models import Post
+
+FTS_TABLE = 'posts_post_fts'
+WORD = re.compile(r'\w+')
+
+
+def is_supported():
+    return connection.vendor == 'sqlite'
+
+
+def match_expression(query):
+    """Запрос пользователя в синтаксисе FTS5: все слова обязательны,
+    последнее может быть началом слова. Спецсимволы FTS5 не
+    пропускаются."""
+    words = WORD.findall(query)
+    if not words:
+        return ''
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def index_posts(posts):
+    if not is_supported():
+        return
+    rows = [(post.pk, post.text) for post in posts]
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+            [(pk,) for pk, _ in rows],
+        )
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE} (rowid, text) VALUES (%s, %s)', rows,
+        )
+
+
+def unindex_post(post):
+    if not is_supported():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+                       [post.pk])
+
+
+def rebuild():
+    """Перестроить индекс по таблице постов; вернуть число постов."""
+    if not is_supported():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, text) '
+            f'SELECT id, text FROM {Post._meta.db_table}'
+        )
+        cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) "
+                       f"VALUES ('optimize')")
+        cursor.execute(f'SELECT COUNT(*) FROM {FTS_TABLE}')
+        return cursor.fetchone()[0]
+
+
+def search_posts(query):
+    """Посты по запросу, самые релевантные первыми."""
+    posts = Post.objects.for_feed()
+    if not is_supported():
+        words = WORD.findall(query)
+        if not words:
+            return posts.none()
+        for word in words:
+            posts = posts.filter(text__icontains=word)
+        return posts
+    expression = match_expression(query)
+    if not expression:
+        return posts.none()
+    post_table = Post._meta.db_table
+    return posts.extra(
+        tables=[FTS_TABLE],
+        where=[f'{FTS_TABLE}.rowid = {post_table}.id',
+               f'{FTS_TABLE} MATCH %s'],
+        params=[expression],
+        order_by=[f'{FTS_TABLE}.rank', '-pub_date'],
+    )
@@ -0,0 +1,231 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save,
+)
+from django.dispatch import receiver
+
+from . import (
+    cards, counters, page_cache, search, thumbnails, timelines,
+)
+from .models import (
+    Comment, Follow, Group, Post, User, UserStats, deleting_posts,
+    posts_bulk_created, posts_bulk_updated,
+)
+
+
+@receiver(post_delete, sender=Post)
+def drop_post_cards(sender, instance, **kwargs):
+    cards.invalidate(instance)
+
+
+@receiver(pre_save, sender=Post)
+def remember_previous_state(sender, instance, **kwargs):
+    instance._previous_group = (None, None)
+    instance._previous_image = ''
+    if instance.pk is not None:
+        group_id, slug, image = (
+            Post.objects.filter(pk=instance.pk)
+            .values_list('group_id', 'group__slug', 'image').first()
+            or (None, None, '')
+        )
+        instance._previous_group = (group_id, slug)
+        instance._previous_image = image or ''
+
+
+@receiver(post_save, sender=Post)
+def count_saved_post(sender, instance, created, **kwargs):
+    previous_group_id, _ = getattr(instance, '_previous_group', (None, None))
+    if created:
+        counters.add_author_posts(instance.author_id, 1)
+    elif previous_group_id == instance.group_id:
+        return
+    elif previous_group_id is not None:
+        counters.add_group_posts(previous_group_id, -1)
+    if instance.group_id is not None:
+        counters.add_group_posts(instance.group_id, 1)
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    counters.add_author_posts(instance.author_id, -1)
+    if instance.group_id is not None:
+        counters.add_group_posts(instance.group_id, -1)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def bump_feed_generations(sender, instance, **kwargs):
+    feeds = page_cache.post_feeds(instance)
+    _, previous_slug = getattr(instance, '_previous_group', (None, None))
+    if previous_slug is not None:
+        feeds.add(page_cache.group_feed(previous_slug))
+    page_cache.bump(*feeds)
+
+
+@receiver(post_save, sender=Post)
+def index_saved_post(sender, instance, **kwargs):
+    search.index_posts([instance])
+
+
+@receiver(post_save, sender=Post)
+def schedule_thumbnails(sender, instance, **kwargs):
+    # Правка текста миниатюры не меняет: генерация лишь сбросила бы
+    # карточки и страницы лент ещё раз.
+    previous_image = getattr(instance, '_previous_image', '')
+    if instance.image and instance.image.name != previous_image:
+        thumbnails.schedule(instance)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_deleted_post(sender, instance, **kwargs):
+    search.unindex_post(instance)
+
+
+@receiver(posts_bulk_created, sender=Post)
+def index_bulk_created_posts(sender, posts, **kwargs):
+    search.index_posts(posts)
+
+
+@receiver(post_save, sender=Post)
+def fan_out_saved_post(sender, instance, created, **kwargs):
+    previous_group_id, _ = getattr(instance, '_previous_group', (None, None))
+    if created:
+        timelines.add_posts([instance])
+    elif previous_group_id != instance.group_id:
+        timelines.move_post(instance, previous_group_id)
+
+
+@receiver(posts_bulk_created, sender=Post)
+def fan_out_bulk_created_posts(sender, posts, **kwargs):
+    timelines.add_posts(posts)
+
+
+@receiver(posts_bulk_created, sender=Post)
+def count_bulk_created_posts(sender, posts, **kwargs):
+    counters.add_posts(posts)
+
+
+@receiver(posts_bulk_created, sender=Post)
+def bump_bulk_feed_generations(sender, posts, **kwargs):
+    author_ids = {post.author_id for post in posts}
+    group_ids = {post.group_id for post in posts}
+    feeds = {page_cache.INDEX_FEED}
+    feeds.update(
+        page_cache.author_feed(username) for username in
+        User.objects.filter(pk__in=author_ids)
+        .values_list('username', flat=True)
+    )
+    feeds.update(
+        page_cache.group_feed(slug) for slug in
+        Group.objects.filter(pk__in=group_ids)
+        .values_list('slug', flat=True)
+    )
+    page_cache.bump(*feeds)
+
+
+@receiver(posts_bulk_updated, sender=Post)
+def count_bulk_updated_posts(sender, posts, previous_groups, **kwargs):
+    counters.move_posts(posts, previous_groups)
+
+
+@receiver(posts_bulk_updated, sender=Post)
+def fan_out_bulk_updated_posts(sender, posts, previous_groups, **kwargs):
+    timelines.move_posts(posts, previous_groups)
+
+
+@receiver(posts_bulk_updated, sender=Post)
+def index_bulk_updated_posts(sender, posts, fields, **kwargs):
+    if 'text' in fields:
+        search.index_posts(posts)
+
+
+@receiver(posts_bulk_updated, sender=Post)
+def bump_bulk_updated_feed_generations(sender, posts, previous_groups,
+                                       **kwargs):
+    feeds = set()
+    for post in posts:
+        feeds.update(page_cache.post_feeds(post))
+    feeds.update(page_cache.group_feed(slug)
+                 for _, slug in previous_groups.values() if slug is not None)
+    if feeds:
+        page_cache.bump(*feeds)
+
+
+@receiver(pre_delete, sender=Group)
+def detach_group_posts(sender, instance, **kwargs):
+    # SET_NULL обновил бы посты в обход PostQuerySet.update: версия не
+    # выросла бы, и карточки из кэша ссылались бы на удалённую группу.
+    Post.objects.filter(group=instance).update(group=None)
+
+
+@receiver(post_save, sender=Group)
+def bump_group_generation(sender, instance, **kwargs):
+    page_cache.bump(page_cache.group_feed(instance.slug))
+
+
+@receiver(pre_delete, sender=Post)
+def mark_deleting_post(sender, instance, **kwargs):
+    # Вне Post.delete и PostQuerySet.delete (каскад от автора) меток нет:
+    # комментарии просто пересчитываются.
+    deleting = deleting_posts.get()
+    if deleting is not None:
+        deleting.add(instance.pk)
+
+
+def _count_comment(comment, delta):
+    # Ленты удаляемого поста сбросит сам пост.
+    if comment.post_id in (deleting_posts.get() or ()):
+        return
+    counters.add_post_comments(comment.post_id, delta)
+    post = (Post.objects.select_related('author', 'group')
+            .filter(pk=comment.post_id).first())
+    if post is not None:
+        page_cache.bump(*page_cache.post_feeds(post))
+
+
+@receiver(post_save, sender=Comment)
+def count_saved_comment(sender, instance, created, **kwargs):
+    if created:
+        _count_comment(instance, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    _count_comment(instance, -1)
+
+
+def _count_follow(follow, delta):
+    counters.add_follow(follow.user_id, follow.author_id, delta)
+    # Счётчики подписок видны в карточке автора на страницах профилей.
+    page_cache.bump(*(
+        page_cache.author_feed(username) for username in
+        User.objects.filter(pk__in=(follow.user_id, follow.author_id))
+        .values_list('username', flat=True)
+    ))
+
+
+@receiver(post_save, sender=Follow)
+def count_saved_follow(sender, instance, created, **kwargs):
+    if created:
+        _count_follow(instance, 1)
+
+
+@receiver(post_delete, sender=Follow)
+def count_deleted_follow(sender, instance, **kwargs):
+    _count_follow(instance, -1)
+
+
+@receiver(post_save, sender=User)
+def create_user_stats(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        UserStats.objects.get_or_create(user=instance)
+
+
+@receiver(connection_created)
+def tune_sqlite_connection(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite' or not settings.SQLITE_PRAGMAS:
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,42 @@
+from django import template
+
+from posts.paginators import page_window
+
+register = template.Library()
+
+# Параметры навигации: переход по страницам заменяет их, остальные
+# параметры запроса (например, ?q= поиска) сохраняются.
+NAVIGATION_PARAMS = ('page', 'cursor')
+
+
+def navigation_query(request):
+    query = request.GET.copy()
+    for name in NAVIGATION_PARAMS:
+        query.pop(name, None)
+    return query
+
+
+@register.simple_tag(takes_context=True)
+def page_query(context, **params):
+    query = navigation_query(context['request'])
+    for name, value in params.items():
+        query[name] = value
+    return '?' + query.urlencode()
+
+
+@register.simple_tag(takes_context=True)
+def page_links(context, page):
+    """Окно номеров страниц со ссылками: список пар (номер, query).
+
+    Вместо пропуска — ``(None, None)``. Окно и строки запроса считаются
+    здесь один раз на страницу, а не тегом на каждую ссылку.
+    """
+    query = navigation_query(context['request'])
+    links = []
+    for number in page_window(page.number, page.paginator.num_pages):
+        if number is None:
+            links.append((None, None))
+            continue
+        query['page'] = number
+        links.append((number, '?' + query.urlencode()))
+    return links
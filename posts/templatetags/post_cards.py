@@ -0,0 +1,57 @@
+from django import template
+
+from posts import cards, thumbnails
+
+register = template.Library()
+
+
+class PostCardNode(template.Node):
+    """Карточка поста из кэша фрагментов (см. posts.cards).
+
+    Шаблон карточки компилируется один раз на узел — то есть на
+    скомпилированный шаблон ленты, — а не ищется загрузчиком для каждой
+    карточки в цикле.
+    """
+
+    def __init__(self, post, template_name):
+        self.post = post
+        self.template_name = template_name
+        self.template = None
+
+    def get_template(self, context, template_name):
+        if self.template is None or self.template.name != template_name:
+            self.template = context.template.engine.get_template(
+                template_name)
+        return self.template
+
+    def render(self, context):
+        post = self.post.resolve(context)
+        template_name = self.template_name.resolve(context)
+        card_template = self.get_template(context, template_name)
+        return cards.render_card(
+            post, template_name, context.get('user'),
+            render=lambda values: card_template.render(context.new(values)),
+        )
+
+
+@register.tag
+def post_card(parser, token):
+    """{% post_card post ['includes/post.html'] %}"""
+    bits = token.split_contents()
+    if len(bits) not in (2, 3):
+        raise template.TemplateSyntaxError(
+            f'{bits[0]} принимает пост и, необязательно, шаблон карточки'
+        )
+    post = parser.compile_filter(bits[1])
+    template_name = parser.compile_filter(
+        bits[2] if len(bits) == 3 else "'includes/post.html'"
+    )
+    return PostCardNode(post, template_name)
+
+
+@register.simple_tag
+def card_thumbnail(image):
+    """Готовая миниатюра картинки для карточки или None; файлы не
+    читаются (см. posts.thumbnails)."""
+    geometry, options = thumbnails.CARD_THUMBNAIL
+    return thumbnails.cached_thumbnail(image, geometry, **options)
@@ -0,0 +1,73 @@
+from io import BytesIO
+
+from django.test import AsyncClient, TransactionTestCase, override_settings
+from django.urls import resolve, reverse
+
+from posts import async_urls, async_views, urls, views
+from posts.models import Post, Group, User
+
+
+@override_settings(ROOT_URLCONF='yatube.asgi_urls',
+                   FEED_PAGE_CACHE_TIMEOUT=0)
+class AsyncViewsTest(TransactionTestCase):
+    # Пул потоков работает со своими соединениями: данные теста должны
+    # быть закоммичены.
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='ivan')
+        self.group = Group.objects.create(
+            title='Группа',
+            slug='group',
+            description='Описание',
+        )
+        self.post = Post.objects.create(text='Асинхронный пост',
+                                        author=self.user, group=self.group)
+
+    async def test_feeds_and_post_view(self):
+        client = AsyncClient()
+        urls = (
+            reverse('index'),
+            reverse('group_posts', kwargs={'slug': self.group.slug}),
+            reverse('profile', kwargs={'username': self.user.username}),
+            reverse('post', kwargs={'username': self.user.username,
+                                    'post_id': self.post.pk}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = await client.get(url)
+                self.assertContains(response, self.post.text)
+                # SQL-запросы из пула потоков попадают в замер запроса.
+                self.assertNotIn('desc="0 queries"',
+                                 response['Server-Timing'])
+
+    async def test_missing_objects_give_404(self):
+        client = AsyncClient()
+        response = await client.get(
+            reverse('group_posts', kwargs={'slug': 'missing'}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_routes_follow_sync_urls(self):
+        routes = [(str(route.pattern), route.name)
+                  for route in async_urls.urlpatterns]
+        self.assertEqual(routes, [(str(route.pattern), route.name)
+                                  for route in urls.urlpatterns])
+        callbacks = {route.name: route.callback
+                     for route in async_urls.urlpatterns}
+        self.assertIs(callbacks['profile'], async_views.profile)
+        self.assertIs(callbacks['new_post'], views.new_post)
+
+    def test_asgi_entry_uses_async_routes(self):
+        """Вход ASGI подставляет yatube.asgi_urls, а остальные маршруты
+        сайта берёт из yatube.urls."""
+        from yatube import asgi, asgi_urls, urls as site_urls
+
+        request, _ = asgi.application.create_request(
+            {'type': 'http', 'method': 'GET', 'path': '/',
+             'query_string': b'', 'headers': []}, BytesIO())
+        self.assertEqual(request.urlconf, asgi.ASGI_URLCONF)
+        self.assertEqual(len(asgi_urls.urlpatterns),
+                         len(site_urls.urlpatterns))
+        match = resolve('/', urlconf=asgi.ASGI_URLCONF)
+        self.assertIs(match.func, async_views.index)
+        match = resolve(reverse('about_author'), urlconf=asgi.ASGI_URLCONF)
+        self.assertEqual(match.url_name, 'about_author')
@@ -0,0 +1,60 @@
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+from posts import cards
+from posts.models import Post, User
+
+
+@override_settings(FEED_PAGE_CACHE_TIMEOUT=0)
+class PostCardCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='ivan')
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.user)
+        cls.guest_client = Client()
+
+    def setUp(self):
+        cache.clear()
+        cards.reset_stats()
+        self.post = Post.objects.create(text='Старый текст', author=self.user)
+
+    def test_second_render_is_a_hit(self):
+        """Повторная отрисовка ленты берёт карточку из кэша."""
+        self.guest_client.get(reverse('index'))
+        self.assertEqual(cards.stats()['misses'], 1)
+        response = self.guest_client.get(reverse('index'))
+        self.assertEqual(cards.stats()['hits'], 1)
+        self.assertContains(response, self.post.text)
+
+    def test_edit_invalidates_card(self):
+        """После post_edit лента показывает новый текст."""
+        self.guest_client.get(reverse('index'))
+        self.authorized_client.post(
+            reverse('post_edit', kwargs={
+                'username': self.user.username,
+                'post_id': self.post.id}),
+            data={'text': 'Обновлённый текст'},
+        )
+        response = self.guest_client.get(reverse('index'))
+        self.assertContains(response, 'Обновлённый текст')
+        self.assertNotContains(response, 'Старый текст')
+
+    def test_new_post_appears(self):
+        self.guest_client.get(reverse('index'))
+        self.authorized_client.post(reverse('new_post'),
+                                    data={'text': 'Новый пост'})
+        response = self.guest_client.get(reverse('index'))
+        self.assertContains(response, 'Новый пост')
+
+    def test_author_card_is_not_shared(self):
+        """Кнопка редактирования из карточки автора не попадает
+        к гостю."""
+        edit_url = reverse('post_edit', kwargs={
+            'username': self.user.username, 'post_id': self.post.id})
+        response = self.authorized_client.get(reverse('index'))
+        self.assertContains(response, edit_url)
+        response = self.guest_client.get(reverse('index'))
+        self.assertNotContains(response, edit_url)
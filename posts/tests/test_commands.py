@@ -0,0 +1,110 @@
+import json
+import os
+from io import StringIO
+from tempfile import TemporaryDirectory
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from posts.models import Post, Group, User, UserStats
+
+
+class ExplainFeedsCommandTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='ivan')
+        cls.group = Group.objects.create(
+            title='Название',
+            slug='slug',
+            description='Описание',
+        )
+        Post.objects.create(text='Текст', group=cls.group, author=cls.user)
+
+    def test_feeds_use_indexes(self):
+        """Каждая лента читается по своему составному индексу."""
+        out = StringIO()
+        call_command('explain_feeds', '--check', stdout=out)
+        output = out.getvalue()
+        for index in ('post_pub_date_idx', 'post_author_pub_date_idx',
+                      'post_group_pub_date_idx'):
+            with self.subTest(index=index):
+                self.assertIn(index, output)
+
+
+class ImportPostsCommandTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='ivan')
+        cls.group = Group.objects.create(
+            title='Название',
+            slug='slug',
+            description='Описание',
+        )
+        cls.tmp = TemporaryDirectory()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+        super().tearDownClass()
+
+    def write(self, name, content):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'w', encoding='utf-8') as target:
+            target.write(content)
+        return path
+
+    def test_import_jsonl(self):
+        rows = [
+            {'text': 'Первый', 'author': 'ivan', 'group': 'slug',
+             'pub_date': '2020-01-02T03:04:05+00:00'},
+            {'text': 'Второй', 'author': 'ivan'},
+            {'text': 'Без автора', 'author': 'nobody'},
+            {'text': 'Без группы', 'author': 'ivan', 'group': 'missing'},
+        ]
+        path = self.write('posts.jsonl',
+                          '\n'.join(json.dumps(row) for row in rows))
+        out = StringIO()
+        call_command('import_posts', path, '--batch-size', '1', stdout=out)
+        self.assertIn('Импортировано: 2, пропущено: 2', out.getvalue())
+        first = Post.objects.get(text='Первый')
+        self.assertEqual(first.group, self.group)
+        self.assertEqual(first.pub_date.year, 2020)
+        self.assertIsNone(Post.objects.get(text='Второй').group)
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 1)
+        self.assertEqual(
+            UserStats.objects.get(user=self.user).posts_count, 2)
+
+    def test_malformed_rows_are_skipped(self):
+        lines = [
+            json.dumps({'text': 'Первый', 'author': 'ivan'}),
+            json.dumps([1, 2]),
+            json.dumps({'text': 'Дата', 'author': 'ivan',
+                        'pub_date': '2020-13-45T00:00:00'}),
+            json.dumps({'text': 'Автор', 'author': ['ivan']}),
+            json.dumps({'text': 'Последний', 'author': 'ivan'}),
+        ]
+        path = self.write('posts.jsonl', '\n'.join(lines))
+        out = StringIO()
+        call_command('import_posts', path, '--batch-size', '2', stdout=out)
+        self.assertIn('Импортировано: 2, пропущено: 3', out.getvalue())
+
+    def test_import_csv(self):
+        path = self.write(
+            'posts.csv',
+            'text,author,group,pub_date\n'
+            'Первый,ivan,slug,2020-01-02 03:04:05\n'
+            '"Второй, с запятой",ivan,,\n'
+        )
+        call_command('import_posts', path, stdout=StringIO())
+        self.assertEqual(
+            set(Post.objects.values_list('text', flat=True)),
+            {'Первый', 'Второй, с запятой'},
+        )
+
+    def test_missing_file(self):
+        with self.assertRaises(CommandError):
+            call_command('import_posts',
+                         os.path.join(self.tmp.name, 'missing.jsonl'))
@@ -0,0 +1,145 @@
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models.signals import pre_delete
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts import counters
+from posts.models import Comment, Post, User, deleting_posts
+from posts.views import PAGINATE_BY
+
+
+class CommentTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='lev')
+        cls.reader = User.objects.create_user(username='ivan')
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(text='Текст', author=self.author)
+        self.post_url = reverse('post', kwargs={
+            'username': self.author.username, 'post_id': self.post.pk})
+        self.comment_url = reverse('add_comment', kwargs={
+            'username': self.author.username, 'post_id': self.post.pk})
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def test_comment_is_shown_and_counted(self):
+        updated_at, version = self.post.updated_at, self.post.version
+        response = self.client.post(self.comment_url,
+                                    {'text': 'Комментарий'}, follow=True)
+        self.assertRedirects(response, self.post_url)
+        self.assertContains(response, 'Комментарий')
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 1)
+        self.assertGreater(self.post.version, version)
+        self.assertEqual(self.post.updated_at, updated_at)
+        Comment.objects.get().delete()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 0)
+
+    def test_anonymous_cannot_comment(self):
+        response = Client().post(self.comment_url, {'text': 'Комментарий'})
+        self.assertRedirects(response,
+                             reverse('login') + '?next=' + self.comment_url)
+        self.assertEqual(self.client.get(self.comment_url).status_code, 405)
+        self.assertFalse(Comment.objects.exists())
+
+    def test_feed_cards_show_fresh_count(self):
+        """Комментарий сбрасывает кэш карточки и страницы ленты."""
+        guest = Client()
+        self.assertContains(guest.get(reverse('index')), 'Комментариев: 0')
+        self.client.post(self.comment_url, {'text': 'Комментарий'})
+        self.assertContains(guest.get(reverse('index')), 'Комментариев: 1')
+
+    def test_feed_does_not_query_comments(self):
+        def index_queries():
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(reverse('index'))
+            return len(queries)
+
+        before = index_queries()
+        for i in range(3):
+            Post.objects.create(text=f'Пост {i}', author=self.author)
+            Comment.objects.create(post=self.post, author=self.reader,
+                                   text='Комментарий')
+        self.assertEqual(index_queries(), before)
+
+    def test_comments_are_paginated_with_authors(self):
+        users = [User.objects.create_user(username=f'user{i}')
+                 for i in range(PAGINATE_BY + 3)]
+        Comment.objects.bulk_create(
+            Comment(post=self.post, author=user, text=f'Комментарий {i}')
+            for i, user in enumerate(users)
+        )
+        expected = list(self.post.comments.order_by('-created', '-pk')
+                        .values_list('pk', flat=True))
+        response = self.client.get(self.post_url)
+        page = response.context['page']
+        self.assertEqual([c.pk for c in page], expected[:PAGINATE_BY])
+        response = self.client.get(self.post_url,
+                                   {'cursor': page.next_cursor})
+        self.assertEqual([c.pk for c in response.context['page']],
+                         expected[PAGINATE_BY:])
+
+    def test_comment_authors_are_joined(self):
+        """Число запросов страницы поста не зависит от числа авторов
+        комментариев."""
+        def post_view_queries():
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(self.post_url)
+            return len(queries)
+
+        Comment.objects.create(post=self.post, author=self.reader,
+                               text='Комментарий')
+        before = post_view_queries()
+        for i in range(5):
+            Comment.objects.create(
+                post=self.post, text='Комментарий',
+                author=User.objects.create_user(username=f'user{i}'))
+        self.assertEqual(post_view_queries(), before)
+
+    def test_post_delete_skips_comment_counting(self):
+        """Каскадное удаление комментариев не трогает удаляемый пост."""
+        def delete_queries(comments):
+            post = Post.objects.create(text='Текст', author=self.author)
+            Comment.objects.bulk_create(
+                Comment(post=post, author=self.reader, text='Комментарий')
+                for _ in range(comments))
+            with CaptureQueriesContext(connection) as queries:
+                post.delete()
+            return len(queries)
+
+        self.assertEqual(delete_queries(20), delete_queries(1))
+
+    def test_rolled_back_delete_keeps_comment_counting(self):
+        """Откаченное удаление не оставляет посту метку «удаляется»."""
+        def refuse(sender, instance, **kwargs):
+            raise RuntimeError('Удаление отменено')
+
+        pre_delete.connect(refuse, sender=Post)
+        try:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                self.post.delete()
+        finally:
+            pre_delete.disconnect(refuse, sender=Post)
+        self.assertIsNone(deleting_posts.get())
+        Comment.objects.create(post=self.post, author=self.reader,
+                               text='Комментарий')
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 1)
+
+    def test_drift_is_repaired(self):
+        Comment.objects.create(post=self.post, author=self.reader,
+                               text='Комментарий')
+        Post.objects.filter(pk=self.post.pk).update(comments_count=5)
+        drift = [d for d in counters.find_drift() if d[0] is Post]
+        self.assertEqual(drift, [(Post, self.post.pk, {'comments_count': 5},
+                                  {'comments_count': 1})])
+        counters.repair(drift)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 1)
@@ -0,0 +1,111 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+from posts.models import Post, Group, User, UserStats
+
+
+class PostCountersTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='ivan')
+        cls.group = Group.objects.create(
+            title='Группа',
+            slug='group',
+            description='Описание',
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа',
+            slug='other-group',
+            description='Описание',
+        )
+
+    def assertCounts(self, author, group, other_group):
+        self.assertEqual(
+            UserStats.objects.get(user=self.user).posts_count, author)
+        self.group.refresh_from_db()
+        self.other_group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, group)
+        self.assertEqual(self.other_group.posts_count, other_group)
+
+    def test_create_and_delete(self):
+        post = Post.objects.create(text='Текст', author=self.user,
+                                   group=self.group)
+        Post.objects.create(text='Текст', author=self.user)
+        self.assertCounts(2, 1, 0)
+        post.delete()
+        self.assertCounts(1, 0, 0)
+
+    def test_group_change(self):
+        post = Post.objects.create(text='Текст', author=self.user,
+                                   group=self.group)
+        post.group = self.other_group
+        post.save()
+        self.assertCounts(1, 0, 1)
+        post.group = None
+        post.save()
+        self.assertCounts(1, 0, 0)
+        post.text = 'Новый текст'
+        post.save()
+        self.assertCounts(1, 0, 0)
+
+    def test_queryset_update_moves_group(self):
+        Post.objects.bulk_create(
+            Post(text=f'Текст {i}', author=self.user, group=self.group)
+            for i in range(3)
+        )
+        Post.objects.filter(pk=Post.objects.latest('pk').pk).update(
+            group=self.other_group)
+        self.assertCounts(3, 2, 1)
+        Post.objects.filter(group=self.group).update(group=None)
+        self.assertCounts(3, 0, 1)
+
+    def test_bulk_create(self):
+        Post.objects.bulk_create(
+            Post(text=f'Текст {i}', author=self.user, group=self.group)
+            for i in range(5)
+        )
+        self.assertCounts(5, 5, 0)
+
+    def test_recount_repairs_drift(self):
+        Post.objects.create(text='Текст', author=self.user, group=self.group)
+        Group.objects.filter(pk=self.group.pk).update(posts_count=7)
+        UserStats.objects.filter(user=self.user).delete()
+        out = StringIO()
+        call_command('recount_posts', '--dry-run', stdout=out)
+        self.assertIn('Расхождений: 2', out.getvalue())
+        call_command('recount_posts', stdout=StringIO())
+        self.assertCounts(1, 1, 0)
+
+
+@override_settings(FEED_PAGE_CACHE_TIMEOUT=0)
+class CountedPagesTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='ivan')
+        cls.group = Group.objects.create(
+            title='Группа',
+            slug='group',
+            description='Описание',
+        )
+        Post.objects.bulk_create(
+            Post(text=f'Текст {i}', author=cls.user, group=cls.group)
+            for i in range(3)
+        )
+
+    def test_pages_do_not_count_posts(self):
+        """Профиль и группа берут число постов из счётчиков: запросы
+        только за поколением ленты и страницей постов."""
+        urls = (
+            reverse('profile', kwargs={'username': self.user.username}),
+            reverse('group_posts', kwargs={'slug': self.group.slug}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                with self.assertNumQueries(3):
+                    response = Client().get(url)
+                self.assertEqual(response.context['paginator'].count, 3)
@@ -0,0 +1,68 @@
+import csv
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.http import StreamingHttpResponse
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from posts.models import Post, Group, User
+
+
+class ExportPostsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='ivan')
+        cls.other = User.objects.create_user(username='igor')
+        cls.group = Group.objects.create(
+            title='Название',
+            slug='slug',
+            description='Описание',
+        )
+        cls.post = Post.objects.create(text='Пост с группой',
+                                       author=cls.user, group=cls.group)
+        Post.objects.create(text='Пост без группы', author=cls.other)
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.user)
+
+    def test_command_jsonl(self):
+        out = StringIO()
+        call_command('export_posts', '--chunk-size', '1', stdout=out)
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([r['text'] for r in records],
+                         ['Пост с группой', 'Пост без группы'])
+        self.assertEqual(records[0]['author'], 'ivan')
+        self.assertEqual(records[0]['group'], 'slug')
+
+    def test_command_filters(self):
+        out = StringIO()
+        call_command('export_posts', '--group', 'slug', '--format', 'csv',
+                     stdout=out)
+        rows = list(csv.DictReader(StringIO(out.getvalue())))
+        self.assertEqual([row['text'] for row in rows], ['Пост с группой'])
+
+        out = StringIO()
+        call_command('export_posts', '--author', 'igor',
+                     '--since', '2000-01-01', stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 1)
+
+    def test_endpoint_streams(self):
+        response = self.authorized_client.get(
+            reverse('export_posts'), {'format': 'csv', 'author': 'ivan'})
+        self.assertIsInstance(response, StreamingHttpResponse)
+        content = b''.join(response.streaming_content).decode()
+        rows = list(csv.DictReader(StringIO(content)))
+        self.assertEqual([row['id'] for row in rows], [str(self.post.pk)])
+
+    def test_endpoint_requires_login(self):
+        response = Client().get(reverse('export_posts'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_endpoint_rejects_bad_parameters(self):
+        for params in ({'format': 'xml'}, {'since': 'вчера'}):
+            with self.subTest(params=params):
+                response = self.authorized_client.get(
+                    reverse('export_posts'), params)
+                self.assertEqual(response.status_code, 400)
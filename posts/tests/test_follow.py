@@ -0,0 +1,138 @@
+from datetime import timedelta
+
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Follow, Post, User, UserStats
+from posts.paginators import FanInPaginator
+from posts.views import PAGINATE_BY
+
+
+class FollowTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='ivan')
+        cls.author = User.objects.create_user(username='lev')
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.follow_url = reverse('profile_follow',
+                                  kwargs={'username': self.author.username})
+        self.unfollow_url = reverse('profile_unfollow',
+                                    kwargs={'username': self.author.username})
+
+    def stats(self, user):
+        return UserStats.objects.get(user=user)
+
+    def test_follow_and_unfollow(self):
+        self.client.post(self.follow_url)
+        self.client.post(self.follow_url)
+        self.assertEqual(Follow.objects.filter(
+            user=self.user, author=self.author).count(), 1)
+        self.assertEqual(self.stats(self.author).followers_count, 1)
+        self.assertEqual(self.stats(self.user).following_count, 1)
+        self.client.post(self.unfollow_url)
+        self.assertFalse(Follow.objects.exists())
+        self.assertEqual(self.stats(self.author).followers_count, 0)
+        self.assertEqual(self.stats(self.user).following_count, 0)
+
+    def test_follow_requires_post(self):
+        response = self.client.get(self.follow_url)
+        self.assertEqual(response.status_code, 405)
+        self.assertFalse(Follow.objects.exists())
+
+    def test_cannot_follow_self(self):
+        self.client.post(reverse('profile_follow',
+                                 kwargs={'username': self.user.username}))
+        self.assertFalse(Follow.objects.exists())
+
+    def test_author_card_shows_counts(self):
+        self.client.post(self.follow_url)
+        profile_url = reverse('profile',
+                              kwargs={'username': self.author.username})
+        response = self.client.get(profile_url)
+        self.assertContains(response, 'Подписчиков: 1')
+        self.assertContains(response, self.unfollow_url)
+        response = Client().get(profile_url)
+        self.assertContains(response, 'Подписчиков: 1')
+        self.assertNotContains(response, self.unfollow_url)
+
+
+class FollowFeedTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='ivan')
+        cls.authors = [User.objects.create_user(username=f'author{i}')
+                       for i in range(4)]
+        cls.stranger = User.objects.create_user(username='stranger')
+        for author in cls.authors[:3]:
+            Follow.objects.create(user=cls.user, author=author)
+        posts = Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=author)
+            for i in range(PAGINATE_BY * 3)
+            for author in (cls.authors[i % 4], cls.stranger)
+        )
+        # auto_now_add перезаписывает pub_date при вставке, поэтому даты
+        # ставятся после: посты авторов вперемешку по времени, по четыре
+        # с одной датой, и более поздние посты получают более ранние id.
+        start = timezone.now()
+        for minutes in range(len(posts) // 4):
+            Post.objects.filter(
+                pk__in=[post.pk for post in posts[minutes * 4:][:4]]
+            ).update(pub_date=start + timedelta(minutes=minutes % 3 * 10
+                                                - minutes))
+        cls.expected = list(
+            Post.objects.filter(author__in=cls.authors[:3])
+            .order_by('-pub_date', '-pk').values_list('pk', flat=True)
+        )
+
+    def test_fixture_has_ties_and_interleaving(self):
+        rows = list(Post.objects.filter(author__in=self.authors[:3])
+                    .order_by('pk').values_list('pub_date', flat=True))
+        self.assertLess(len(set(rows)), len(rows))
+        self.assertNotEqual(rows, sorted(rows))
+        self.assertNotEqual(rows, sorted(rows, reverse=True))
+        # Граница первой страницы проходит внутри одной даты.
+        dates = dict(Post.objects.values_list('pk', 'pub_date'))
+        self.assertEqual(dates[self.expected[PAGINATE_BY - 1]],
+                         dates[self.expected[PAGINATE_BY]])
+
+    def paginator(self):
+        return FanInPaginator(Post.objects.all(),
+                              User.objects.filter(following__user=self.user),
+                              PAGINATE_BY)
+
+    def test_walk_merges_followed_authors(self):
+        paginator = self.paginator()
+        pages = [paginator.page()]
+        while pages[-1].has_next():
+            pages.append(paginator.page(pages[-1].next_cursor))
+        self.assertEqual([p.pk for page in pages for p in page],
+                         self.expected)
+        page = pages[-1]
+        for expected in reversed(pages[:-1]):
+            page = paginator.page(page.previous_cursor)
+            self.assertEqual([p.pk for p in page], [p.pk for p in expected])
+
+    def test_queries_do_not_depend_on_followees(self):
+        paginator = self.paginator()
+        cursor = paginator.page().next_cursor
+        with self.assertNumQueries(2):
+            paginator.page(cursor)
+
+    @override_settings(FEED_PAGE_CACHE_TIMEOUT=0)
+    def test_follow_index(self):
+        client = Client()
+        client.force_login(self.user)
+        response = client.get(reverse('follow_index'))
+        self.assertEqual([p.pk for p in response.context['page']],
+                         self.expected[:PAGINATE_BY])
+        self.assertContains(
+            response, f'?cursor={response.context["page"].next_cursor}')
+        self.assertRedirects(
+            Client().get(reverse('follow_index')),
+            reverse('login') + '?next=' + reverse('follow_index'))
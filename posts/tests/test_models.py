@@ -1,6 +1,7 @@
 from django.test import TestCase, Client
 
-from posts.models import Post, Group, User
+from posts import page_cache
+from posts.models import FeedGeneration, Post, Group, User
 
 
 class PostsModelTest(TestCase):
@@ -58,3 +59,58 @@ class PostsModelTest(TestCase):
         for key, value in post_context.items():
             with self.subTest(key=key, value=value):
                 self.assertEqual(key, value)
+
+
+class PostVersionTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='alex')
+
+    def setUp(self):
+        self.post = Post.objects.create(text='Текст', author=self.user)
+
+    def test_save_bumps_version(self):
+        self.assertEqual(self.post.version, 1)
+        created_key = self.post.cache_key
+        self.post.text = 'Новый текст'
+        self.post.save()
+        self.assertEqual(self.post.version, 2)
+        self.assertNotEqual(self.post.cache_key, created_key)
+        self.post.save(update_fields=['text'])
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.version, 3)
+        self.assertGreater(self.post.updated_at, self.post.pub_date)
+
+    def test_queryset_update_bumps_version(self):
+        updated_at = self.post.updated_at
+        Post.objects.filter(pk=self.post.pk).update(text='Массовая правка')
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.version, 2)
+        self.assertGreater(self.post.updated_at, updated_at)
+
+    def test_queryset_update_bumps_feeds(self):
+        group = Group.objects.create(title='Группа', slug='group',
+                                     description='Описание')
+        feeds = (page_cache.INDEX_FEED, page_cache.group_feed(group.slug))
+        before = dict(FeedGeneration.objects.filter(feed__in=feeds)
+                      .values_list('feed', 'generation'))
+        Post.objects.filter(pk=self.post.pk).update(group=group)
+        after = dict(FeedGeneration.objects.filter(feed__in=feeds)
+                     .values_list('feed', 'generation'))
+        for feed in feeds:
+            with self.subTest(feed=feed):
+                self.assertNotEqual(after[feed], before.get(feed))
+
+    def test_queryset_update_keeps_author(self):
+        with self.assertRaises(ValueError):
+            Post.objects.update(author=User.objects.create_user('igor'))
+
+    def test_group_deletion_bumps_version(self):
+        group = Group.objects.create(title='Группа', slug='group',
+                                     description='Описание')
+        Post.objects.filter(pk=self.post.pk).update(group=group)
+        group.delete()
+        self.post.refresh_from_db()
+        self.assertIsNone(self.post.group)
+        self.assertEqual(self.post.version, 3)
@@ -0,0 +1,180 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from posts.models import Post, Group, User
+
+
+class FeedPageCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='ivan')
+        cls.other = User.objects.create_user(username='igor')
+        cls.group = Group.objects.create(
+            title='Группа',
+            slug='group',
+            description='Описание',
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа',
+            slug='other-group',
+            description='Описание',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.post = Post.objects.create(
+            text='Старый текст', author=self.user, group=self.group)
+        self.urls = {
+            'index': reverse('index'),
+            'group': reverse('group_posts',
+                             kwargs={'slug': self.group.slug}),
+            'other_group': reverse('group_posts',
+                                   kwargs={'slug': self.other_group.slug}),
+            'profile': reverse('profile',
+                               kwargs={'username': self.user.username}),
+            'other_profile': reverse(
+                'profile', kwargs={'username': self.other.username}),
+        }
+
+    def test_anonymous_pages_are_cached(self):
+        for url in self.urls.values():
+            with self.subTest(url=url):
+                self.guest_client.get(url)
+                # Только поколение ленты.
+                with self.assertNumQueries(1):
+                    response = self.guest_client.get(url)
+                self.assertIsNone(response.context)
+
+    def test_authorized_pages_are_not_cached(self):
+        url = self.urls['index']
+        self.authorized_client.get(url)
+        response = self.authorized_client.get(url)
+        self.assertIsNotNone(response.context)
+
+    def test_new_post_drops_only_its_feeds(self):
+        """Новый пост сбрасывает главную, свою группу и свой профиль,
+        но не чужие ленты."""
+        for url in self.urls.values():
+            self.guest_client.get(url)
+        self.authorized_client.post(
+            reverse('new_post'),
+            data={'text': 'Новый пост', 'group': self.group.id})
+        expected = {
+            'index': True,
+            'group': True,
+            'other_group': False,
+            'profile': True,
+            'other_profile': False,
+        }
+        for name, changed in expected.items():
+            with self.subTest(feed=name):
+                response = self.guest_client.get(self.urls[name])
+                self.assertEqual(response.context is not None, changed)
+                if changed:
+                    self.assertContains(response, 'Новый пост')
+
+    def test_group_change_drops_both_groups(self):
+        for url in self.urls.values():
+            self.guest_client.get(url)
+        self.authorized_client.post(
+            reverse('post_edit', kwargs={
+                'username': self.user.username,
+                'post_id': self.post.id}),
+            data={'text': 'Новый текст', 'group': self.other_group.id},
+        )
+        response = self.guest_client.get(self.urls['group'])
+        self.assertNotContains(response, 'Новый текст')
+        self.assertNotContains(response, 'Старый текст')
+        response = self.guest_client.get(self.urls['other_group'])
+        self.assertContains(response, 'Новый текст')
+
+    def test_delete_drops_feeds(self):
+        self.guest_client.get(self.urls['index'])
+        self.post.delete()
+        response = self.guest_client.get(self.urls['index'])
+        self.assertNotContains(response, 'Старый текст')
+
+
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='ivan')
+        cls.other = User.objects.create_user(username='igor')
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.post = Post.objects.create(text='Текст', author=self.user)
+        self.urls = (
+            reverse('index'),
+            reverse('profile', kwargs={'username': self.user.username}),
+            reverse('post', kwargs={'username': self.user.username,
+                                    'post_id': self.post.pk}),
+        )
+
+    def test_unchanged_pages_give_304_after_one_query(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                etag = self.guest_client.get(url)['ETag']
+                with self.assertNumQueries(1):
+                    response = self.guest_client.get(
+                        url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+
+    def test_etag_survives_empty_process_cache(self):
+        """Поколения хранятся в базе: процесс со своим пустым кэшем
+        узнаёт ETag, выданный другим процессом."""
+        url = self.urls[0]
+        etag = self.guest_client.get(url)['ETag']
+        cache.clear()
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_edit_changes_etag(self):
+        etags = {url: self.guest_client.get(url)['ETag']
+                 for url in self.urls}
+        self.post.text = 'Новый текст'
+        self.post.save()
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                response = self.guest_client.get(url,
+                                                 HTTP_IF_NONE_MATCH=etag)
+                self.assertContains(response, 'Новый текст')
+
+    def test_etag_depends_on_user(self):
+        url = self.urls[0]
+        etag = self.guest_client.get(url)['ETag']
+        client = Client()
+        client.force_login(self.other)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Last-Modified', response)
+        self.assertEqual(
+            client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+            .status_code, 304)
+
+    def test_etag_depends_on_csrf_token(self):
+        """Вход меняет CSRF-токен: страница с формами старым токеном
+        не должна остаться у браузера по 304."""
+        client = Client()
+        client.force_login(self.user)
+        url = self.urls[1]
+        client.cookies[settings.CSRF_COOKIE_NAME] = 'a' * 64
+        etag = client.get(url)['ETag']
+        client.cookies[settings.CSRF_COOKIE_NAME] = 'b' * 64
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_if_modified_since(self):
+        url = self.urls[0]
+        last_modified = self.guest_client.get(url)['Last-Modified']
+        response = self.guest_client.get(
+            url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
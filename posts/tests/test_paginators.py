@@ -0,0 +1,171 @@
+from base64 import urlsafe_b64encode
+
+from django.test import SimpleTestCase, TestCase, Client
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Post, Group, User
+from posts.paginators import CursorPaginator, page_window
+from posts.views import PAGINATE_BY
+
+
+class CursorPaginatorTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='ivan')
+        cls.group = Group.objects.create(
+            title='Название',
+            slug='slug',
+            description='Описание',
+        )
+        cls.POST_NUMBER = PAGINATE_BY * 2 + 3
+        Post.objects.bulk_create(
+            Post(text=f'Текст тестового поста {i}',
+                 group=cls.group,
+                 author=cls.user)
+            for i in range(cls.POST_NUMBER)
+        )
+        cls.expected = list(
+            Post.objects.order_by('-pub_date', '-pk')
+            .values_list('pk', flat=True)
+        )
+
+    def walk_forward(self, paginator):
+        pages = [paginator.page()]
+        while pages[-1].has_next():
+            pages.append(paginator.page(pages[-1].next_cursor))
+        return pages
+
+    def test_forward_walk_covers_all_posts_once(self):
+        """Переход по next_cursor отдаёт все посты по порядку без
+        повторов."""
+        paginator = CursorPaginator(Post.objects.all(), PAGINATE_BY)
+        pages = self.walk_forward(paginator)
+        seen = [post.pk for page in pages for post in page]
+        self.assertEqual(seen, self.expected)
+        self.assertFalse(pages[0].has_previous())
+        self.assertEqual(len(pages[-1]), self.POST_NUMBER % PAGINATE_BY)
+
+    def test_backward_walk_returns_same_pages(self):
+        """previous_cursor возвращает ровно предыдущую страницу."""
+        paginator = CursorPaginator(Post.objects.all(), PAGINATE_BY)
+        pages = self.walk_forward(paginator)
+        page = pages[-1]
+        for expected in reversed(pages[:-1]):
+            page = paginator.page(page.previous_cursor)
+            self.assertEqual([p.pk for p in page], [p.pk for p in expected])
+        self.assertFalse(page.has_previous())
+
+    def test_equal_dates_across_page_boundary(self):
+        """Посты с одной датой не теряются и не повторяются на границе
+        страниц: порядок уточняет id."""
+        author = User.objects.create_user(username='twins')
+        Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=author)
+            for i in range(PAGINATE_BY * 2 + 3)
+        )
+        posts = Post.objects.filter(author=author)
+        # Середина ленты — одна дата на обе стороны границы страниц.
+        pks = list(posts.order_by('-pk').values_list('pk', flat=True))
+        posts.filter(pk__in=pks[PAGINATE_BY - 3:PAGINATE_BY * 2 + 2]).update(
+            pub_date=timezone.now())
+        expected = list(posts.order_by('-pub_date', '-pk')
+                        .values_list('pk', flat=True))
+        paginator = CursorPaginator(posts, PAGINATE_BY)
+        pages = self.walk_forward(paginator)
+        self.assertEqual([p.pk for page in pages for p in page], expected)
+        page = pages[-1]
+        for previous in reversed(pages[:-1]):
+            page = paginator.page(page.previous_cursor)
+            self.assertEqual([p.pk for p in page], [p.pk for p in previous])
+
+    def test_page_does_not_count(self):
+        """Страница курсора — один запрос, без COUNT(*)."""
+        paginator = CursorPaginator(Post.objects.all(), PAGINATE_BY)
+        first = paginator.page()
+        with self.assertNumQueries(1):
+            paginator.page(first.next_cursor)
+
+    def test_broken_cursor_gives_first_page(self):
+        paginator = CursorPaginator(Post.objects.all(), PAGINATE_BY)
+        for cursor in ('', 'мусор', 'bm90LWEtY3Vyc29y'):
+            with self.subTest(cursor=cursor):
+                page = paginator.get_page(cursor)
+                self.assertEqual([p.pk for p in page],
+                                 self.expected[:PAGINATE_BY])
+
+    def test_out_of_range_pk_gives_first_page(self):
+        for pk in (0, 10 ** 30):
+            with self.subTest(pk=pk):
+                raw = f'n|2020-01-01T00:00:00+00:00|{pk}'
+                cursor = urlsafe_b64encode(raw.encode()).decode()
+                response = Client().get(reverse('index'), {'cursor': cursor})
+                self.assertEqual(
+                    [p.pk for p in response.context['page']],
+                    self.expected[:PAGINATE_BY])
+
+    def test_naive_cursor_date_is_aware(self):
+        raw = 'n|2020-01-01T00:00:00|1'
+        cursor = urlsafe_b64encode(raw.encode()).decode()
+        _, pub_date, _ = CursorPaginator.decode_cursor(cursor)
+        self.assertFalse(pub_date.tzinfo is None)
+
+    def test_feed_views_accept_cursor(self):
+        """Ленты переключаются на курсор параметром ?cursor=."""
+        client = Client()
+        urls = (
+            reverse('index'),
+            reverse('group_posts', kwargs={'slug': self.group.slug}),
+            reverse('profile', kwargs={'username': self.user.username}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = client.get(url, {'cursor': ''})
+                page = response.context['page']
+                self.assertIsInstance(response.context['paginator'],
+                                      CursorPaginator)
+                self.assertEqual(len(page), PAGINATE_BY)
+                self.assertContains(response, f'?cursor={page.next_cursor}')
+                response = client.get(url, {'cursor': page.next_cursor})
+                self.assertEqual(
+                    [p.pk for p in response.context['page']],
+                    self.expected[PAGINATE_BY:PAGINATE_BY * 2])
+
+
+class PageWindowTest(SimpleTestCase):
+    def test_short_range_is_complete(self):
+        self.assertEqual(page_window(1, 1), [1])
+        self.assertEqual(page_window(3, 5), [1, 2, 3, 4, 5])
+
+    def test_gaps_are_elided(self):
+        self.assertEqual(page_window(1, 10000), [1, 2, 3, None, 10000])
+        self.assertEqual(page_window(500, 10000),
+                         [1, None, 498, 499, 500, 501, 502, None, 10000])
+        self.assertEqual(page_window(10000, 10000),
+                         [1, None, 9998, 9999, 10000])
+
+    def test_single_page_gap_is_shown(self):
+        """Пропуск в одну страницу заменяется её номером."""
+        self.assertEqual(page_window(5, 10),
+                         [1, 2, 3, 4, 5, 6, 7, None, 10])
+
+
+class PageLinksTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='ivan')
+        Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=cls.user)
+            for i in range(PAGINATE_BY * 40)
+        )
+
+    def test_navigation_is_windowed(self):
+        """Навигация не перечисляет все страницы ленты."""
+        response = Client().get(reverse('index'), {'page': 20})
+        content = response.content.decode()
+        self.assertIn('href="?page=19"', content)
+        self.assertIn('href="?page=40"', content)
+        self.assertNotIn('href="?page=10"', content)
+        self.assertIn('&hellip;', content)
@@ -0,0 +1,100 @@
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from posts import search
+from posts.models import Post, User
+from posts.views import PAGINATE_BY
+
+
+class MatchExpressionTest(TestCase):
+    def test_words_are_quoted(self):
+        """Спецсимволы FTS5 из запроса не попадают в выражение."""
+        cases = {
+            'кот': '"кот"*',
+            'рыжий кот': '"рыжий" "кот"*',
+            'кот" OR 1 -- (': '"кот" "OR" "1"*',
+            '  *** ': '',
+        }
+        for query, expected in cases.items():
+            with self.subTest(query=query):
+                self.assertEqual(search.match_expression(query), expected)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'FTS5 есть только в SQLite')
+class PostSearchTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='ivan')
+        cls.client = Client()
+
+    def found(self, query):
+        return list(search.search_posts(query).values_list('text', flat=True))
+
+    def test_ranked_search(self):
+        Post.objects.create(text='Про собак и немного про кота',
+                            author=self.user)
+        Post.objects.create(text='Кот, кот и ещё раз кот', author=self.user)
+        Post.objects.create(text='Совсем про другое', author=self.user)
+        self.assertEqual(self.found('кот'), [
+            'Кот, кот и ещё раз кот',
+            'Про собак и немного про кота',
+        ])
+        self.assertEqual(self.found('собак кот'),
+                         ['Про собак и немного про кота'])
+
+    def test_index_follows_edit_and_delete(self):
+        post = Post.objects.create(text='Старый текст', author=self.user)
+        post.text = 'Новый текст'
+        post.save()
+        self.assertEqual(self.found('старый'), [])
+        self.assertEqual(self.found('новый'), ['Новый текст'])
+        post.delete()
+        self.assertEqual(self.found('новый'), [])
+
+    def test_index_follows_queryset_update(self):
+        Post.objects.create(text='Старый текст', author=self.user)
+        Post.objects.filter(text='Старый текст').update(text='Новый текст')
+        self.assertEqual(self.found('старый'), [])
+        self.assertEqual(self.found('новый'), ['Новый текст'])
+
+    def test_bulk_created_posts_are_indexed(self):
+        posts = Post.objects.bulk_create(
+            Post(text=f'Пост номер {i}', author=self.user) for i in range(3)
+        )
+        self.assertTrue(all(post.pk for post in posts))
+        self.assertEqual(len(self.found('номер')), 3)
+
+    def test_rebuild_command(self):
+        Post.objects.create(text='Текст для поиска', author=self.user)
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {search.FTS_TABLE}')
+        self.assertEqual(self.found('поиска'), [])
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn('Проиндексировано постов: 1', out.getvalue())
+        self.assertEqual(self.found('поиска'), ['Текст для поиска'])
+
+    def test_search_view_paginates_with_query(self):
+        Post.objects.bulk_create(
+            Post(text=f'Искомый пост {i}', author=self.user)
+            for i in range(PAGINATE_BY + 1)
+        )
+        response = self.client.get(reverse('search'), {'q': 'искомый'})
+        self.assertEqual(response.context['paginator'].count,
+                         PAGINATE_BY + 1)
+        self.assertContains(response, '?q=%D0%B8%D1%81%D0%BA%D0%BE%D0%BC'
+                                      '%D1%8B%D0%B9&amp;page=2')
+        response = self.client.get(reverse('search'),
+                                   {'q': 'искомый', 'page': 2})
+        self.assertEqual(len(response.context['page']), 1)
+
+    def test_empty_query(self):
+        Post.objects.create(text='Текст', author=self.user)
+        response = self.client.get(reverse('search'))
+        self.assertEqual(len(response.context['page']), 0)
@@ -0,0 +1,37 @@
+import os
+import tempfile
+
+from django.db import connections
+from django.test import TransactionTestCase, override_settings
+
+from yatube.settings import profiles
+
+production = profiles.production()
+
+
+class SqlitePragmasTest(TransactionTestCase):
+    def connect(self, path):
+        default = connections['default']
+        wrapper = default.__class__(
+            {**default.settings_dict, 'NAME': path}, alias='pragmas',
+        )
+        self.addCleanup(wrapper.close)
+        return wrapper.cursor()
+
+    def pragma(self, cursor, name):
+        cursor.execute(f'PRAGMA {name}')
+        return cursor.fetchone()[0]
+
+    def test_production_pragmas_applied_on_connect(self):
+        path = os.path.join(tempfile.mkdtemp(), 'db.sqlite3')
+        with override_settings(SQLITE_PRAGMAS=production.SQLITE_PRAGMAS):
+            cursor = self.connect(path)
+        self.assertEqual(self.pragma(cursor, 'journal_mode'), 'wal')
+        self.assertEqual(self.pragma(cursor, 'synchronous'), 1)
+        self.assertEqual(self.pragma(cursor, 'cache_size'),
+                         production.SQLITE_PRAGMAS['cache_size'])
+
+    def test_no_pragmas_by_default(self):
+        path = os.path.join(tempfile.mkdtemp(), 'db.sqlite3')
+        cursor = self.connect(path)
+        self.assertEqual(self.pragma(cursor, 'journal_mode'), 'delete')
@@ -0,0 +1,108 @@
+import hashlib
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from posts import thumbnails
+from posts.models import Post, User
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def image_bytes(color='red'):
+    buffer = BytesIO()
+    Image.new('RGB', (1200, 800), color).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, FEED_PAGE_CACHE_TIMEOUT=0)
+class PostImageTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='ivan')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def publish(self, content, name='photo.PNG'):
+        with mock.patch.object(thumbnails, 'schedule') as schedule:
+            self.client.post(reverse('new_post'), {
+                'text': 'Пост с картинкой',
+                'image': SimpleUploadedFile(name, content, 'image/png'),
+            })
+        post = Post.objects.latest('pk')
+        schedule.assert_called_once_with(post)
+        return post
+
+    def test_image_name_is_content_hash(self):
+        content = image_bytes()
+        digest = hashlib.sha256(content).hexdigest()
+        first = self.publish(content)
+        second = self.publish(content, name='copy.png')
+        expected = f'posts/{digest[:2]}/{digest}.png'
+        self.assertEqual(first.image.name, expected)
+        self.assertEqual(second.image.name, expected)
+        other = self.publish(image_bytes('blue'))
+        self.assertNotEqual(other.image.name, expected)
+
+    def test_thumbnail_is_not_generated_in_request(self):
+        post = self.publish(image_bytes())
+        geometry, options = thumbnails.CARD_THUMBNAIL
+        self.assertIsNone(
+            thumbnails.cached_thumbnail(post.image, geometry, **options))
+        response = self.client.get(reverse('index'))
+        self.assertContains(response, post.image.url)
+
+    def test_generated_thumbnail_replaces_image_in_cards(self):
+        post = self.publish(image_bytes())
+        self.client.get(reverse('index'))
+        thumbnails.generate(post.pk)
+        geometry, options = thumbnails.CARD_THUMBNAIL
+        thumbnail = thumbnails.cached_thumbnail(post.image, geometry,
+                                                **options)
+        self.assertEqual((thumbnail.width, thumbnail.height), (960, 339))
+        # Карточка из кэша сброшена, а страница читает только
+        # key-value хранилище миниатюр.
+        forbidden = mock.Mock(side_effect=AssertionError('файловый ввод'))
+        with mock.patch.multiple(FileSystemStorage, open=forbidden,
+                                 exists=forbidden, size=forbidden):
+            response = self.client.get(reverse('index'))
+        self.assertContains(response, thumbnail.url)
+        self.assertNotContains(response, f'src="{post.image.url}"')
+
+    def test_generate_changes_card_key(self):
+        """Обработчик задач сбрасывает карточку через базу: его кэш
+        может быть не общим с веб-процессами."""
+        post = self.publish(image_bytes())
+        thumbnails.generate(post.pk)
+        updated = Post.objects.get(pk=post.pk)
+        self.assertEqual(updated.version, post.version + 1)
+        self.assertEqual(updated.updated_at, post.updated_at)
+
+    def test_only_new_image_schedules_thumbnails(self):
+        post = self.publish(image_bytes())
+        with mock.patch.object(thumbnails, 'defer') as defer:
+            post.text = 'Новый текст'
+            post.save()
+        defer.assert_not_called()
+        with mock.patch.object(thumbnails, 'defer') as defer:
+            post.image = SimpleUploadedFile('other.png', image_bytes('blue'),
+                                            'image/png')
+            post.save()
+        defer.assert_called_once_with(thumbnails.generate, post.pk)
@@ -0,0 +1,111 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+from posts import timelines
+from posts.models import Post, Group, TimelineEntry, User
+from posts.timelines import Timeline
+from posts.views import PAGINATE_BY
+
+
+@override_settings(FEED_TIMELINES=True, FEED_PAGE_CACHE_TIMEOUT=0)
+class TimelineTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='ivan')
+        cls.group = Group.objects.create(
+            title='Группа',
+            slug='group',
+            description='Описание',
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа',
+            slug='other',
+            description='Описание',
+        )
+
+    def timeline(self, owner_type, owner_id):
+        return list(
+            TimelineEntry.objects.filter(owner_type=owner_type,
+                                         owner_id=owner_id)
+            .order_by('-pub_date', '-post_id')
+            .values_list('post_id', flat=True)
+        )
+
+    def test_post_fans_out_to_author_and_group(self):
+        post = Post.objects.create(text='Пост', author=self.user,
+                                   group=self.group)
+        self.assertEqual(self.timeline(TimelineEntry.AUTHOR, self.user.pk),
+                         [post.pk])
+        self.assertEqual(self.timeline(TimelineEntry.GROUP, self.group.pk),
+                         [post.pk])
+
+    def test_group_change_moves_post(self):
+        post = Post.objects.create(text='Пост', author=self.user,
+                                   group=self.group)
+        post.group = self.other_group
+        post.save()
+        self.assertEqual(self.timeline(TimelineEntry.GROUP, self.group.pk),
+                         [])
+        self.assertEqual(
+            self.timeline(TimelineEntry.GROUP, self.other_group.pk),
+            [post.pk])
+        post.delete()
+        self.assertFalse(TimelineEntry.objects.exists())
+
+    def test_queryset_update_moves_posts(self):
+        post = Post.objects.create(text='Пост', author=self.user,
+                                   group=self.group)
+        Post.objects.filter(group=self.group).update(group=self.other_group)
+        self.assertEqual(self.timeline(TimelineEntry.GROUP, self.group.pk),
+                         [])
+        self.assertEqual(
+            self.timeline(TimelineEntry.GROUP, self.other_group.pk),
+            [post.pk])
+
+    def test_bulk_create_and_backfill_agree(self):
+        Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=self.user,
+                 group=self.group if i % 2 else None)
+            for i in range(7)
+        )
+        expected = set(TimelineEntry.objects.values_list(
+            'owner_type', 'owner_id', 'post_id', 'pub_date'))
+        self.assertEqual(len(expected), 7 + 3)
+        call_command('backfill_timelines', '--batch-size=3',
+                     stdout=StringIO())
+        self.assertEqual(set(TimelineEntry.objects.values_list(
+            'owner_type', 'owner_id', 'post_id', 'pub_date')), expected)
+
+    def test_failed_rebuild_keeps_timelines(self):
+        post = Post.objects.create(text='Пост', author=self.user)
+        with mock.patch.object(TimelineEntry.objects, 'bulk_create',
+                               side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                timelines.rebuild()
+        self.assertEqual(self.timeline(TimelineEntry.AUTHOR, self.user.pk),
+                         [post.pk])
+
+    def test_feeds_read_pages_from_timeline(self):
+        Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=self.user, group=self.group)
+            for i in range(PAGINATE_BY + 3)
+        )
+        expected = list(self.group.posts.order_by('-pub_date', '-pk')
+                        .values_list('pk', flat=True))
+        urls = (
+            reverse('group_posts', kwargs={'slug': self.group.slug}),
+            reverse('profile', kwargs={'username': self.user.username}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = Client().get(url, {'page': 2})
+                page = response.context['page']
+                self.assertIsInstance(page.paginator.object_list, Timeline)
+                self.assertEqual([post.pk for post in page],
+                                 expected[PAGINATE_BY:])
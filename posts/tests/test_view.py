@@ -1,5 +1,9 @@
+from unittest.mock import patch
+
 from django import forms
-from django.test import TestCase, Client
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from posts.models import Post, User, Group
@@ -196,3 +200,52 @@ class PaginatorViewsTest(TestCase):
                     self.assertEqual(
                         len(response.context.get('page').object_list),
                         int(records))
+
+
+@override_settings(FEED_PAGE_CACHE_TIMEOUT=0)
+class FeedQueriesTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='ivan')
+        cls.group = Group.objects.create(
+            title='Название',
+            slug='slug',
+            description='Описание',
+        )
+        authors = [
+            User.objects.create_user(username=f'author{i}')
+            for i in range(PAGINATE_BY)
+        ]
+        Post.objects.bulk_create(
+            Post(text=f'Текст {i}', group=cls.group, author=author)
+            for i, author in enumerate(authors * 3)
+        )
+        Post.objects.bulk_create(
+            Post(text=f'Текст {i}', group=cls.group, author=cls.user)
+            for i in range(PAGINATE_BY * 2)
+        )
+
+    def test_feed_query_count_does_not_depend_on_page_size(self):
+        """Число запросов на страницу ленты не растёт с PAGINATE_BY:
+        автор и группа подтягиваются тем же запросом."""
+        pages = (
+            reverse('index'),
+            reverse('group_posts', kwargs={'slug': self.group.slug}),
+            reverse('profile', kwargs={'username': self.user.username}),
+        )
+        for url in pages:
+            queries = {}
+            for per_page in (1, PAGINATE_BY, PAGINATE_BY * 2):
+                with patch('posts.views.PAGINATE_BY', per_page):
+                    with CaptureQueriesContext(connection) as ctx:
+                        self.client.get(url)
+                queries[per_page] = len(ctx.captured_queries)
+            with self.subTest(url=url):
+                self.assertEqual(len(set(queries.values())), 1, queries)
+
+    def test_index_query_count(self):
+        """Главная страница: поколение ленты, COUNT для паджинатора
+        и один SELECT."""
+        with self.assertNumQueries(3):
+            self.client.get(reverse('index'))
@@ -0,0 +1,68 @@
+"""Миниатюры картинок постов для карточек лент.
+
+Запрос ленты миниатюры не создаёт и файлов не читает: сохранение поста
+с картинкой (posts.signals) ставит их генерацию в очередь фоновых задач
+(tasks, её выполняет ``manage.py run_worker``), а карточка (тег
+``card_thumbnail``) только ищет готовую миниатюру в key-value
+хранилище sorl-thumbnail — кэше поверх таблицы. Пока миниатюры нет,
+карточка показывает исходную картинку; когда она готова, у поста
+меняется версия, а у его лент — поколения (posts.page_cache). Это
+записи в базе, поэтому карточки и страницы лент сбрасываются и в кэшах
+веб-процессов, а не только в кэше обработчика задач.
+"""
+from django.db.models import F
+from sorl.thumbnail import default, get_thumbnail
+from sorl.thumbnail.conf import defaults as sorl_defaults
+from sorl.thumbnail.conf import settings as sorl_settings
+from sorl.thumbnail.images import ImageFile
+
+from tasks.queue import defer, task
+from . import page_cache
+from .models import Post
+
+# Миниатюры, которые нужны карточкам: геометрия и параметры sorl.
+CARD_THUMBNAIL = ('960x339', {'crop': 'center', 'upscale': True})
+THUMBNAILS = (CARD_THUMBNAIL,)
+
+
+def thumbnail_file(image, geometry, **options):
+    """Миниатюра под тем именем, под которым её сохранит get_thumbnail;
+    хранилища не трогаются."""
+    backend = default.backend
+    source = ImageFile(image)
+    if sorl_settings.THUMBNAIL_PRESERVE_FORMAT:
+        options.setdefault('format', backend._get_format(source))
+    for key, value in backend.default_options.items():
+        options.setdefault(key, value)
+    for key, name in backend.extra_options:
+        value = getattr(sorl_settings, name)
+        if value != getattr(sorl_defaults, name):
+            options.setdefault(key, value)
+    name = backend._get_thumbnail_filename(source, geometry, options)
+    return ImageFile(name, default.storage)
+
+
+def cached_thumbnail(image, geometry, **options):
+    """Готовая миниатюра из key-value хранилища или None."""
+    if not image:
+        return None
+    return default.kvstore.get(thumbnail_file(image, geometry, **options))
+
+
+@task
+def generate(post_id):
+    """Создать миниатюры поста и сбросить кэши, где он показан без них."""
+    post = (Post.objects.select_related('author', 'group')
+            .filter(pk=post_id).first())
+    if post is None or not post.image:
+        return
+    for geometry, options in THUMBNAILS:
+        get_thumbnail(post.image, geometry, **options)
+    # Новая версия — новый ключ карточки (Post.cache_key); время
+    # изменения поста не трогается.
+    Post.objects.filter(pk=post.pk).update(updated_at=F('updated_at'))
+    page_cache.bump(*page_cache.post_feeds(post))
+
+
+def schedule(post):
+    defer(generate, post.pk)
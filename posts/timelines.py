@@ -0,0 +1,117 @@
+"""Материализованные ленты групп и авторов (fan-out on write).
+
+При ``FEED_TIMELINES`` каждый пост получает строку TimelineEntry в ленте
+автора и в ленте группы; сигналы (posts.signals) ведут их при
+публикации, смене группы и массовой вставке, удаление поста удаляет их
+каскадом. Страница ленты — срез индекса TimelineEntry и выборка постов
+по первичному ключу, без сортировки таблицы постов.
+"""
+from django.conf import settings
+from django.db import transaction
+
+from .models import Post, TimelineEntry
+
+
+def entries_for(post):
+    entries = [TimelineEntry(owner_type=TimelineEntry.AUTHOR,
+                             owner_id=post.author_id,
+                             post_id=post.pk, pub_date=post.pub_date)]
+    if post.group_id is not None:
+        entries.append(TimelineEntry(owner_type=TimelineEntry.GROUP,
+                                     owner_id=post.group_id,
+                                     post_id=post.pk,
+                                     pub_date=post.pub_date))
+    return entries
+
+
+def add_posts(posts):
+    if not settings.FEED_TIMELINES:
+        return
+    TimelineEntry.objects.bulk_create(
+        [entry for post in posts for entry in entries_for(post)],
+        ignore_conflicts=True,
+    )
+
+
+def move_post(post, previous_group_id):
+    """Перенести пост из ленты прежней группы в ленту новой."""
+    if not settings.FEED_TIMELINES:
+        return
+    TimelineEntry.objects.filter(
+        owner_type=TimelineEntry.GROUP, owner_id=previous_group_id,
+        post_id=post.pk,
+    ).delete()
+    add_posts([post])
+
+
+def move_posts(posts, previous_groups):
+    """То же для многих постов (PostQuerySet.update)."""
+    if not settings.FEED_TIMELINES:
+        return
+    moved = [post for post in posts
+             if previous_groups[post.pk][0] != post.group_id]
+    TimelineEntry.objects.filter(
+        owner_type=TimelineEntry.GROUP,
+        post_id__in=[post.pk for post in moved],
+    ).delete()
+    add_posts(moved)
+
+
+def rebuild(batch_size=2000):
+    """Заполнить ленты заново по таблице постов; вернуть число строк.
+
+    Всё в одной транзакции: пока ленты пересобираются, страницы читают
+    прежние строки, а не пустые или неполные ленты.
+    """
+    with transaction.atomic():
+        TimelineEntry.objects.all().delete()
+        total = 0
+        batch = []
+        rows = Post.objects.order_by().values_list(
+            'pk', 'author_id', 'group_id', 'pub_date',
+        ).iterator(chunk_size=batch_size)
+        for pk, author_id, group_id, pub_date in rows:
+            batch.extend(entries_for(Post(pk=pk, author_id=author_id,
+                                          group_id=group_id,
+                                          pub_date=pub_date)))
+            if len(batch) >= batch_size:
+                TimelineEntry.objects.bulk_create(batch)
+                total += len(batch)
+                batch = []
+        TimelineEntry.objects.bulk_create(batch)
+    return total + len(batch)
+
+
+class Timeline:
+    """Лента владельца как последовательность постов для Paginator.
+
+    Срез читает id постов из индекса TimelineEntry и догружает сами
+    посты одним запросом по первичному ключу.
+    """
+
+    def __init__(self, owner_type, owner_id):
+        self.entries = TimelineEntry.objects.filter(
+            owner_type=owner_type, owner_id=owner_id,
+        ).order_by('-pub_date', '-post_id')
+
+    def count(self):
+        return self.entries.count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        ids = list(self.entries[index].values_list('post_id', flat=True))
+        posts = Post.objects.for_feed().in_bulk(ids)
+        return [posts[pk] for pk in ids if pk in posts]
+
+
+def feed_posts(request, owner_type, owner_id, posts):
+    """Посты ленты для posts.paginators.get_page: из Timeline, если
+    ленты включены. Курсорные страницы и так читаются срезом индекса
+    posts_post, им нужен QuerySet."""
+    if not settings.FEED_TIMELINES or 'cursor' in request.GET:
+        return posts
+    return Timeline(owner_type, owner_id)
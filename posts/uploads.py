@@ -0,0 +1,34 @@
+"""Картинки постов под именами из хэша содержимого.
+
+Одно имя всегда означает одни и те же байты, поэтому файлы (и миниатюры
+sorl-thumbnail, чьи имена выводятся из имени исходника) можно отдавать
+с долгим кэшированием: новая картинка — это новый URL.
+"""
+import hashlib
+import os
+
+from django.core.files.storage import FileSystemStorage
+
+IMAGE_DIR = 'posts'
+
+
+def image_path(instance, filename):
+    digest = hashlib.sha256()
+    for chunk in instance.image.chunks():
+        digest.update(chunk)
+    name = digest.hexdigest()
+    extension = os.path.splitext(filename)[1].lower()
+    return f'{IMAGE_DIR}/{name[:2]}/{name}{extension}'
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """Уже сохранённый файл не перезаписывается и не получает суффикс:
+    под тем же именем лежат те же байты."""
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def _save(self, name, content):
+        if self.exists(name):
+            return name
+        return super()._save(name, content)
@@ -6,9 +6,18 @@ urlpatterns = [
     path('', views.index, name='index'),
     path('group/<slug:slug>/', views.group_posts, name='group_posts'),
     path('new/', views.new_post, name='new_post'),
+    path('export/', views.export_posts, name='export_posts'),
+    path('search/', views.search_posts, name='search'),
+    path('follow/', views.follow_index, name='follow_index'),
     path('', views.index, name='index'),
     path('<str:username>/', views.profile, name='profile'),
     path('<str:username>/<int:post_id>/', views.post_view, name='post'),
+    path('<str:username>/follow/', views.profile_follow,
+         name='profile_follow'),
+    path('<str:username>/unfollow/', views.profile_unfollow,
+         name='profile_unfollow'),
+    path('<str:username>/<int:post_id>/comment/', views.add_comment,
+         name='add_comment'),
     path(
         '<str:username>/<int:post_id>/edit/',
         views.post_edit,
@@ -1,35 +1,60 @@
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
 from django.shortcuts import render, get_object_or_404, redirect
+from django.views.decorators.http import require_POST
 
+from yatube.routers import read_from_replica
 from yatube.settings import PAGINATE_BY
-from .forms import PostForm
-from .models import Post, Group, User
+from . import export, search, timelines
+from .counters import author_stats
+from .forms import CommentForm, PostForm
+from .models import Follow, Post, Group, TimelineEntry, User
+from .page_cache import (
+    INDEX_FEED, author_feed, cache_feed_page, conditional_feed_page,
+    group_feed,
+)
+from .paginators import CursorPaginator, FanInPaginator, get_page
 
 
+@read_from_replica
+@conditional_feed_page(lambda: [INDEX_FEED])
+@cache_feed_page(lambda: [INDEX_FEED])
 def index(request):
-    post_list = Post.objects.all()
-    paginator = Paginator(post_list, PAGINATE_BY)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
+    post_list = Post.objects.for_feed()
+    page = get_page(request, post_list, PAGINATE_BY)
     return render(request, 'index.html',
-                  {'page': page})
+                  {'page': page, 'paginator': page.paginator})
 
 
+@read_from_replica
+@conditional_feed_page(lambda slug: [group_feed(slug)])
+@cache_feed_page(lambda slug: [group_feed(slug)])
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
-
-    paginator = Paginator(posts, PAGINATE_BY)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
+    posts = timelines.feed_posts(request, TimelineEntry.GROUP, group.pk,
+                                 group.posts.for_feed())
+    page = get_page(request, posts, PAGINATE_BY, count=group.posts_count)
     return render(request, 'group.html',
-                  {'group': group, 'page': page})
+                  {'group': group, 'page': page,
+                   'paginator': page.paginator})
+
+
+@read_from_replica
+def search_posts(request):
+    query = request.GET.get('q', '').strip()
+    posts = search.search_posts(query)
+    page = get_page(request, posts, PAGINATE_BY)
+    context = {
+        'query': query,
+        'page': page,
+        'paginator': page.paginator,
+    }
+    return render(request, 'search.html', context)
 
 
 @login_required
 def new_post(request):
-    form = PostForm(request.POST or None)
+    form = PostForm(request.POST or None, files=request.FILES or None)
     if form.is_valid():
         post = form.save(commit=False)
         post.author = request.user
@@ -38,24 +63,90 @@ def new_post(request):
     return render(request, 'post_new.html', {'form': form})
 
 
+@read_from_replica
+@conditional_feed_page(lambda username: [author_feed(username)])
+@cache_feed_page(lambda username: [author_feed(username)])
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    posts = author.posts.all()
-    paginator = Paginator(posts, PAGINATE_BY)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
-    number_of_posts = posts.count()
-    context = {
+    author = get_object_or_404(User.objects.select_related('stats'),
+                               username=username)
+    posts = timelines.feed_posts(request, TimelineEntry.AUTHOR, author.pk,
+                                 author.posts.for_feed())
+    context = author_card_context(request, author)
+    page = get_page(request, posts, PAGINATE_BY,
+                    count=context['number_of_posts'])
+    context.update(page=page, paginator=page.paginator)
+    return render(request, 'profile.html', context)
+
+
+def author_card_context(request, author):
+    """Контекст карточки автора (includes/author.html)."""
+    stats = author_stats(author)
+    following = (
+        request.user.is_authenticated and request.user != author
+        and Follow.objects.filter(user=request.user, author=author).exists()
+    )
+    return {
         'author': author,
-        'number_of_posts': number_of_posts,
-        'page': page,
+        'stats': stats,
+        'number_of_posts': stats.posts_count,
+        'following': following,
     }
-    return render(request, 'profile.html', context)
 
 
+# Правка поста увеличивает поколение ленты его автора.
+@read_from_replica
+@conditional_feed_page(lambda username, post_id: [author_feed(username)])
 def post_view(request, username, post_id):
+    post = get_object_or_404(Post.objects.for_feed(),
+                             author__username=username, id=post_id)
+    # Комментарии — keyset-страницами, авторы тем же запросом.
+    comments = CursorPaginator(post.comments.select_related('author'),
+                               PAGINATE_BY, date_field='created')
+    page = comments.get_page(request.GET.get('cursor'))
+    context = author_card_context(request, post.author)
+    context.update(post=post, page=page, paginator=comments,
+                   form=CommentForm())
+    return render(request, 'post.html', context)
+
+
+@login_required
+@require_POST
+def add_comment(request, username, post_id):
     post = get_object_or_404(Post, author__username=username, id=post_id)
-    return render(request, "post.html", {"author": post.author, "post": post})
+    form = CommentForm(request.POST)
+    if form.is_valid():
+        comment = form.save(commit=False)
+        comment.author = request.user
+        comment.post = post
+        comment.save()
+    return redirect('post', username=username, post_id=post_id)
+
+
+@login_required
+@read_from_replica
+def follow_index(request):
+    authors = User.objects.filter(following__user=request.user)
+    paginator = FanInPaginator(Post.objects.for_feed(), authors, PAGINATE_BY)
+    page = paginator.get_page(request.GET.get('cursor'))
+    return render(request, 'follow.html',
+                  {'page': page, 'paginator': paginator})
+
+
+@login_required
+@require_POST
+def profile_follow(request, username):
+    author = get_object_or_404(User, username=username)
+    if author != request.user:
+        Follow.objects.get_or_create(user=request.user, author=author)
+    return redirect('profile', username=username)
+
+
+@login_required
+@require_POST
+def profile_unfollow(request, username):
+    Follow.objects.filter(user=request.user,
+                          author__username=username).delete()
+    return redirect('profile', username=username)
 
 
 @login_required
@@ -63,8 +154,33 @@ def post_edit(request, username, post_id):
     post = get_object_or_404(Post, author__username=username, id=post_id)
     if request.user != post.author:
         return redirect('post', post_id=post.id, username=post.author.username)
-    form = PostForm(request.POST or None, instance=post)
+    form = PostForm(request.POST or None, files=request.FILES or None,
+                    instance=post)
     if form.is_valid():
         form.save()
         return redirect('post', post_id=post.id, username=post.author.username)
     return render(request, 'post_new.html', {'form': form, 'post': post})
+
+
+@login_required
+def export_posts(request):
+    export_format = request.GET.get('format', 'jsonl')
+    if export_format not in export.FORMATS:
+        return HttpResponseBadRequest('Неизвестный формат выгрузки')
+    try:
+        rows = export.export_rows(
+            author=request.GET.get('author'),
+            group=request.GET.get('group'),
+            since=request.GET.get('since'),
+            until=request.GET.get('until'),
+        )
+    except ValueError as error:
+        return HttpResponseBadRequest(str(error))
+    response = StreamingHttpResponse(
+        export.iter_export(rows, export_format),
+        content_type=export.CONTENT_TYPES[export_format],
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="posts.{export_format}"'
+    )
+    return response
@@ -0,0 +1,19 @@
+from django.contrib import admin
+
+from .models import QueuedEmail, Task
+
+
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'name', 'status', 'attempts', 'available_at')
+    list_filter = ('status', 'name')
+    empty_value_display = ('-пусто-')
+
+
+class QueuedEmailAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'created', 'attempts', 'claimed_until')
+    exclude = ('message',)
+    empty_value_display = ('-пусто-')
+
+
+admin.site.register(Task, TaskAdmin)
+admin.site.register(QueuedEmail, QueuedEmailAdmin)
@@ -0,0 +1,134 @@
+"""Отправка писем из очереди фоновых задач.
+
+``QueuedEmailBackend`` (``EMAIL_BACKEND``) не соединяется с почтовым
+сервером в запросе: письма сохраняются в таблицу, а после фиксации
+транзакции в очередь ставится задача ``deliver``. Обработчик задач
+отправляет все ожидающие письма через ``EMAIL_DELIVERY_BACKEND``
+(в бою — SMTP) пачками по ``EMAIL_BATCH_SIZE`` за одно соединение.
+
+Если сервер отверг письмо, ошибка записывается в само письмо, и
+отправка пачки продолжается; письмо повторяется с растущей задержкой
+(tasks.queue.retry_delay) отдельной задачей ``deliver``. Письмо, которое
+не ушло ``EMAIL_MAX_ATTEMPTS`` раз, больше не отправляется и остаётся
+в таблице с текстом ошибки. Если же оборвалось соединение, остаток
+пачки возвращается в очередь, а задача падает и повторяется сама.
+"""
+import copy
+import pickle
+import smtplib
+import traceback
+from datetime import timedelta
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db.models import Min, Q
+from django.utils import timezone
+
+from .models import QueuedEmail
+from .queue import defer, enqueue_at, retry_delay, task
+
+# Ошибки соединения, а не письма: письма в них не виноваты.
+CONNECTION_ERRORS = (
+    smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError,
+    smtplib.SMTPHeloError, smtplib.SMTPAuthenticationError,
+)
+
+
+def is_connection_error(error):
+    # Ошибки SMTP — подклассы OSError; остальные OSError — сбои сети.
+    return (isinstance(error, CONNECTION_ERRORS)
+            or (isinstance(error, OSError)
+                and not isinstance(error, smtplib.SMTPException)))
+
+
+def dump_message(message):
+    message = copy.copy(message)
+    # Соединение отправителя не нужно обработчику и не сериализуется.
+    message.connection = None
+    return pickle.dumps(message)
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        queued = [QueuedEmail(message=dump_message(message))
+                  for message in email_messages if message.recipients()]
+        if not queued:
+            return 0
+        QueuedEmail.objects.bulk_create(queued)
+        defer(deliver)
+        return len(queued)
+
+
+def claim_batch(size):
+    """Взять до ``size`` ожидающих писем, старые первыми."""
+    now = timezone.now()
+    free = (Q(claimed_until__isnull=True) | Q(claimed_until__lt=now))
+    pks = list(
+        QueuedEmail.objects.filter(free,
+                                   attempts__lt=settings.EMAIL_MAX_ATTEMPTS)
+        .order_by('pk').values_list('pk', flat=True)[:size]
+    )
+    token = uuid4().hex
+    # Письмо, которое успел взять другой обработчик, уже не свободно.
+    QueuedEmail.objects.filter(free, pk__in=pks).update(
+        claim=token,
+        claimed_until=now + timedelta(seconds=settings.TASK_LEASE),
+    )
+    return list(QueuedEmail.objects.filter(claim=token).order_by('pk'))
+
+
+def release(emails):
+    QueuedEmail.objects.filter(pk__in=[email.pk for email in emails]).update(
+        claim='', claimed_until=None)
+
+
+def send_batch(connection, batch):
+    sent = []
+    try:
+        for position, email in enumerate(batch):
+            try:
+                connection.send_messages([pickle.loads(email.message)])
+            except Exception as error:
+                if is_connection_error(error):
+                    release(batch[position:])
+                    raise
+                # До следующей попытки письмо занято «ничьей» арендой.
+                email.attempts += 1
+                email.last_error = traceback.format_exc()
+                email.claim = ''
+                email.claimed_until = (timezone.now()
+                                       + retry_delay(email.attempts))
+                email.save()
+                continue
+            sent.append(email.pk)
+    finally:
+        QueuedEmail.objects.filter(pk__in=sent).delete()
+    return len(sent)
+
+
+def next_retry():
+    """Когда повторить письма, отложенные после ошибки, или None."""
+    return QueuedEmail.objects.filter(
+        claim='', claimed_until__isnull=False,
+        attempts__lt=settings.EMAIL_MAX_ATTEMPTS,
+    ).aggregate(at=Min('claimed_until'))['at']
+
+
+@task
+def deliver():
+    """Отправить все ожидающие письма; вернуть число отправленных."""
+    connection = get_connection(settings.EMAIL_DELIVERY_BACKEND)
+    sent = 0
+    # Соединение открывается один раз на все пачки.
+    with connection:
+        while True:
+            batch = claim_batch(settings.EMAIL_BATCH_SIZE)
+            if not batch:
+                break
+            sent += send_batch(connection, batch)
+    retry_at = next_retry()
+    if retry_at is not None:
+        enqueue_at(retry_at, deliver)
+    return sent
@@ -0,0 +1,44 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from tasks import queue
+
+
+class Command(BaseCommand):
+    help = ('Выполняет фоновые задачи из очереди (tasks). Обработчиков '
+            'можно запустить несколько.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить готовые задачи и выйти.',
+        )
+        parser.add_argument(
+            '--poll-interval', type=float,
+            default=settings.TASK_POLL_INTERVAL,
+            help='Через сколько секунд снова проверять пустую очередь.',
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        try:
+            while True:
+                # Соединение живёт между задачами, как между запросами:
+                # закрывается по CONN_MAX_AGE и после ошибок.
+                close_old_connections()
+                done = queue.run_pending()
+                total += done
+                if done and options['verbosity'] > 1:
+                    self.stdout.write(f'Взято задач: {total}')
+                if options['once']:
+                    break
+                if not done:
+                    time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            close_old_connections()
+        self.stdout.write(self.style.SUCCESS(f'Взято задач: {total}'))
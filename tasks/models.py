@@ -0,0 +1,54 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Task(models.Model):
+    """Фоновая задача: вызов функции, помеченной tasks.queue.task.
+
+    Выполненная задача удаляется. ``available_at`` — когда задачу можно
+    брать: у взятой задачи это конец аренды обработчика, у упавшей —
+    время следующей попытки.
+    """
+    QUEUED = 'queued'
+    FAILED = 'failed'
+    STATUSES = (
+        (QUEUED, 'В очереди'),
+        (FAILED, 'Не выполнена'),
+    )
+
+    name = models.CharField(max_length=200)
+    args = models.JSONField(default=list)
+    kwargs = models.JSONField(default=dict)
+    status = models.CharField(max_length=6, choices=STATUSES, default=QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)
+    created = models.DateTimeField(auto_now_add=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        # Обработчик берёт самую раннюю готовую задачу: срез индекса.
+        indexes = [
+            models.Index(fields=['status', 'available_at', 'id'],
+                         name='task_due_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.name} ({self.status})'
+
+
+class QueuedEmail(models.Model):
+    """Письмо, ожидающее отправки (tasks.mail).
+
+    Отправленное письмо удаляется. ``claim`` и ``claimed_until`` — метка
+    обработчика, отправляющего письмо сейчас, и конец его аренды.
+    """
+    # Сериализованный pickle EmailMessage со всеми вложениями.
+    message = models.BinaryField()
+    created = models.DateTimeField(auto_now_add=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    claim = models.CharField(max_length=32, blank=True)
+    claimed_until = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+
+    def __str__(self):
+        return f'{self.pk}: {self.attempts}'
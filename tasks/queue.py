@@ -0,0 +1,121 @@
+"""Очередь фоновых задач в базе.
+
+Работа, которой не место в запросе (миниатюры, письма), ставится в
+очередь функцией ``defer``: строка задачи записывается после фиксации
+транзакции запроса, так что обработчик не увидит задачу раньше данных,
+с которыми она работает, а откат не оставит лишних задач. Выполняет
+задачи ``manage.py run_worker``.
+
+Задачу берёт один обработчик: взятие сдвигает ``available_at`` на
+``TASK_LEASE`` секунд вперёд, и если обработчик упал, задача вернётся
+в очередь по истечении аренды. Упавшая задача повторяется через
+``TASK_RETRY_DELAY`` секунд, удваивая задержку с каждой попыткой, а после
+``TASK_MAX_ATTEMPTS`` попыток остаётся в таблице со статусом «не
+выполнена» и текстом последней ошибки.
+"""
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+# Сколько готовых задач перебирать при взятии, если другие обработчики
+# успевают забрать первые.
+CLAIM_CANDIDATES = 5
+
+
+def task(func):
+    """Пометить функцию как задачу. Аргументы задачи хранятся в JSON."""
+    func.task_name = f'{func.__module__}.{func.__qualname__}'
+    return func
+
+
+def _task_name(func):
+    name = getattr(func, 'task_name', None)
+    if name is None:
+        raise ValueError(f'{func!r} не помечена как задача (tasks.queue.task)')
+    return name
+
+
+def enqueue(func, *args, **kwargs):
+    """Поставить задачу в очередь сразу, в текущей транзакции."""
+    return Task.objects.create(name=_task_name(func), args=list(args),
+                               kwargs=kwargs)
+
+
+def enqueue_at(when, func, *args, **kwargs):
+    """То же, но задачу возьмут не раньше ``when``."""
+    return Task.objects.create(name=_task_name(func), args=list(args),
+                               kwargs=kwargs, available_at=when)
+
+
+def defer(func, *args, **kwargs):
+    """Поставить задачу в очередь после фиксации текущей транзакции."""
+    transaction.on_commit(lambda: enqueue(func, *args, **kwargs))
+
+
+def retry_delay(attempts):
+    delay = settings.TASK_RETRY_DELAY * 2 ** max(attempts - 1, 0)
+    return timedelta(seconds=min(delay, settings.TASK_RETRY_MAX_DELAY))
+
+
+def claim():
+    """Взять самую раннюю готовую задачу или вернуть None."""
+    now = timezone.now()
+    due = (Task.objects.filter(status=Task.QUEUED, available_at__lte=now)
+           .order_by('available_at', 'pk'))
+    for candidate in due[:CLAIM_CANDIDATES]:
+        # Условие на прежний available_at: из двух обработчиков задачу
+        # получит тот, чей UPDATE выполнится первым.
+        claimed = Task.objects.filter(
+            pk=candidate.pk, status=Task.QUEUED,
+            available_at=candidate.available_at,
+        ).update(available_at=now + timedelta(seconds=settings.TASK_LEASE),
+                 attempts=F('attempts') + 1)
+        if claimed:
+            candidate.refresh_from_db()
+            return candidate
+    return None
+
+
+def run(task):
+    """Выполнить взятую задачу; вернуть True, если она выполнена."""
+    try:
+        func = import_string(task.name)
+        if getattr(func, 'task_name', None) != task.name:
+            raise ImportError(f'{task.name} не помечена как задача')
+        func(*task.args, **task.kwargs)
+    except Exception:
+        logger.exception('Задача %s (%s) не выполнена, попытка %s',
+                         task.pk, task.name, task.attempts)
+        changes = {'last_error': traceback.format_exc()}
+        if task.attempts >= settings.TASK_MAX_ATTEMPTS:
+            changes['status'] = Task.FAILED
+        else:
+            changes['available_at'] = (timezone.now()
+                                       + retry_delay(task.attempts))
+        Task.objects.filter(pk=task.pk).update(**changes)
+        return False
+    Task.objects.filter(pk=task.pk).delete()
+    return True
+
+
+def run_pending(limit=None):
+    """Выполнять готовые задачи, пока они есть (не больше ``limit``);
+    вернуть число взятых задач."""
+    done = 0
+    while limit is None or done < limit:
+        task = claim()
+        if task is None:
+            break
+        run(task)
+        done += 1
+    return done
@@ -0,0 +1,277 @@
+import socketserver
+import threading
+from datetime import timedelta
+from email import message_from_bytes
+from io import StringIO
+
+from django.core import mail
+from django.core.management import call_command
+from django.db import transaction
+from django.test import (
+    Client, TestCase, TransactionTestCase, override_settings,
+)
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import User
+from tasks import queue
+from tasks.models import QueuedEmail, Task
+
+calls = []
+
+
+@queue.task
+def remember(value, suffix=''):
+    calls.append(f'{value}{suffix}')
+
+
+@queue.task
+def fail():
+    raise RuntimeError('сбой')
+
+
+def not_a_task():
+    pass
+
+
+@override_settings(TASK_MAX_ATTEMPTS=3, TASK_RETRY_DELAY=10,
+                   TASK_RETRY_MAX_DELAY=25)
+class QueueTest(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def make_due(self):
+        Task.objects.update(available_at=timezone.now())
+
+    def test_task_runs_and_is_deleted(self):
+        queue.enqueue(remember, 'пост', suffix='!')
+        self.assertEqual(queue.run_pending(), 1)
+        self.assertEqual(calls, ['пост!'])
+        self.assertFalse(Task.objects.exists())
+
+    def test_only_tasks_can_be_enqueued(self):
+        with self.assertRaises(ValueError):
+            queue.enqueue(not_a_task)
+        Task.objects.create(name='tasks.tests.not_a_task')
+        with self.assertLogs('tasks.queue', 'ERROR'):
+            queue.run_pending()
+        self.assertEqual(Task.objects.get().attempts, 1)
+
+    def test_failed_task_is_retried_with_backoff(self):
+        queue.enqueue(fail)
+        started = timezone.now()
+        with self.assertLogs('tasks.queue', 'ERROR'):
+            self.assertEqual(queue.run_pending(), 1)
+        task = Task.objects.get()
+        self.assertEqual(task.status, Task.QUEUED)
+        self.assertIn('RuntimeError: сбой', task.last_error)
+        self.assertGreaterEqual(task.available_at,
+                                started + timedelta(seconds=10))
+        # До следующей попытки задачу не берут.
+        self.assertEqual(queue.run_pending(), 0)
+        for _ in range(2):
+            self.make_due()
+            with self.assertLogs('tasks.queue', 'ERROR'):
+                queue.run_pending()
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.attempts), (Task.FAILED, 3))
+        self.make_due()
+        self.assertEqual(queue.run_pending(), 0)
+
+    def test_retry_delay_doubles_up_to_limit(self):
+        self.assertEqual([queue.retry_delay(attempts).seconds
+                          for attempts in (1, 2, 3)], [10, 20, 25])
+
+    def test_claimed_task_is_leased(self):
+        """Взятую задачу не получит другой обработчик, пока не истекла
+        аренда."""
+        queue.enqueue(remember, 'пост')
+        task = queue.claim()
+        self.assertIsNotNone(task)
+        self.assertIsNone(queue.claim())
+        self.make_due()
+        self.assertEqual(queue.claim().pk, task.pk)
+
+    def test_run_worker_once(self):
+        queue.enqueue(remember, 'первый')
+        queue.enqueue(remember, 'второй')
+        out = StringIO()
+        call_command('run_worker', '--once', stdout=out)
+        self.assertEqual(calls, ['первый', 'второй'])
+        self.assertIn('Взято задач: 2', out.getvalue())
+
+
+class DeferTest(TransactionTestCase):
+    def test_enqueued_after_commit_only(self):
+        with transaction.atomic():
+            queue.defer(remember, 'пост')
+            self.assertFalse(Task.objects.exists())
+        self.assertEqual(Task.objects.get().args, ['пост'])
+
+    def test_rolled_back_defer_is_dropped(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            queue.defer(remember, 'пост')
+            raise RuntimeError
+        self.assertFalse(Task.objects.exists())
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """Минимальный SMTP-диалог: принимает письма в server.messages."""
+
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply('220 stub')
+        sender, recipients = None, []
+        for raw in self.rfile:
+            command = raw.decode().strip()
+            verb = command[:4].upper()
+            if verb in ('EHLO', 'HELO'):
+                self.reply('250 stub')
+            elif verb == 'MAIL':
+                sender, recipients = command[10:].strip('<>'), []
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                address = command[8:].strip('<>')
+                if address in self.server.dropped:
+                    return
+                if address in self.server.refused:
+                    self.reply('550 no such user')
+                    continue
+                recipients.append(address)
+                self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 end with .')
+                data = b''.join(iter(self.rfile.readline, b'.\r\n'))
+                self.server.messages.append(
+                    (sender, recipients, message_from_bytes(data)))
+                self.reply('250 OK')
+            elif verb == 'QUIT':
+                self.reply('221 bye')
+                return
+            else:
+                self.reply('250 OK')
+
+
+class StubSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), SMTPHandler)
+        self.connections = 0
+        self.messages = []
+        self.refused = set()
+        # Адреса, на которых сервер обрывает соединение.
+        self.dropped = set()
+
+
+@override_settings(
+    EMAIL_BACKEND='tasks.mail.QueuedEmailBackend',
+    EMAIL_DELIVERY_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+    EMAIL_HOST='127.0.0.1', EMAIL_BATCH_SIZE=2, EMAIL_MAX_ATTEMPTS=2,
+)
+class QueuedEmailTest(TransactionTestCase):
+    def setUp(self):
+        self.server = StubSMTPServer()
+        threading.Thread(target=self.server.serve_forever,
+                         daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        port = self.server.server_address[1]
+        settings = override_settings(EMAIL_PORT=port)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def send(self, *addresses):
+        mail.send_mass_mail([
+            ('Тема', f'Письмо для {address}', 'yatube@example.com',
+             [address])
+            for address in addresses
+        ])
+
+    def test_messages_are_sent_by_worker_over_one_connection(self):
+        self.send('a@example.com', 'b@example.com', 'c@example.com')
+        self.assertEqual(QueuedEmail.objects.count(), 3)
+        self.assertEqual(self.server.connections, 0)
+        queue.run_pending()
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(
+            [(sender, recipients,
+              message.get_payload(decode=True).decode().strip())
+             for sender, recipients, message in self.server.messages],
+            [('yatube@example.com', [address], f'Письмо для {address}')
+             for address in ('a@example.com', 'b@example.com',
+                             'c@example.com')])
+        self.assertFalse(QueuedEmail.objects.exists())
+        self.assertFalse(Task.objects.exists())
+
+    def retry_now(self):
+        Task.objects.update(available_at=timezone.now())
+        QueuedEmail.objects.filter(claim='').update(
+            claimed_until=timezone.now())
+
+    def test_failed_message_does_not_hold_up_batch(self):
+        self.server.refused.add('bad@example.com')
+        self.send('a@example.com', 'bad@example.com', 'c@example.com')
+        queue.run_pending()
+        self.assertEqual([recipients for _, recipients, _ in
+                          self.server.messages],
+                         [['a@example.com'], ['c@example.com']])
+        bad = QueuedEmail.objects.get()
+        self.assertEqual(bad.attempts, 1)
+        self.assertIn('SMTPRecipientsRefused', bad.last_error)
+        # Повтор отложен: ни письмо, ни задача не готовы сейчас.
+        retry = Task.objects.get()
+        self.assertEqual(retry.status, Task.QUEUED)
+        self.assertEqual(retry.available_at, bad.claimed_until)
+        self.assertGreater(retry.available_at, timezone.now())
+        self.assertEqual(queue.run_pending(), 0)
+        self.retry_now()
+        queue.run_pending()
+        # Исчерпавшее попытки письмо больше не повторяется.
+        bad.refresh_from_db()
+        self.assertEqual(bad.attempts, 2)
+        self.assertFalse(Task.objects.exists())
+
+    @override_settings(EMAIL_MAX_ATTEMPTS=5, TASK_MAX_ATTEMPTS=5)
+    def test_refused_message_with_default_attempts(self):
+        self.server.refused.add('bad@example.com')
+        self.send('bad@example.com', 'c@example.com')
+        for _ in range(5):
+            queue.run_pending()
+            self.retry_now()
+        self.assertEqual([recipients for _, recipients, _ in
+                          self.server.messages], [['c@example.com']])
+        self.assertEqual(QueuedEmail.objects.get().attempts, 5)
+        self.assertFalse(Task.objects.exists())
+
+    def test_dropped_connection_retries_task(self):
+        self.server.dropped.add('b@example.com')
+        self.send('a@example.com', 'b@example.com')
+        with self.assertLogs('tasks.queue', 'ERROR'):
+            queue.run_pending()
+        self.assertEqual(len(self.server.messages), 1)
+        # Письмо не виновато: попытка не засчитана, задача повторится.
+        email = QueuedEmail.objects.get()
+        self.assertEqual((email.attempts, email.claim), (0, ''))
+        self.assertEqual(Task.objects.get().attempts, 1)
+        self.server.dropped.clear()
+        self.retry_now()
+        queue.run_pending()
+        self.assertEqual(len(self.server.messages), 2)
+        self.assertFalse(QueuedEmail.objects.exists())
+
+    def test_password_reset_does_not_wait_for_smtp(self):
+        User.objects.create_user(username='ivan', email='ivan@example.com',
+                                 password='password')
+        response = Client().post(reverse('password_reset'),
+                                 {'email': 'ivan@example.com'})
+        self.assertRedirects(response, reverse('password_reset_done'))
+        self.assertEqual(self.server.connections, 0)
+        call_command('run_worker', '--once', stdout=StringIO())
+        (_, recipients, message), = self.server.messages
+        self.assertEqual(recipients, ['ivan@example.com'])
+        self.assertIn('/auth/reset/', message.get_payload(decode=True)
+                      .decode())
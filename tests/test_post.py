@@ -79,8 +79,8 @@ class TestPostEditView:
         assert 'form' in response.context, (
             'Проверьте, что передали форму `form` в контекст страницы `/<username>/<post_id>/edit/`'
         )
-        assert len(response.context['form'].fields) == 2, (
-            'Проверьте, что в форме `form` на страницу `/<username>/<post_id>/edit/` 2 поля'
+        assert len(response.context['form'].fields) == 3, (
+            'Проверьте, что в форме `form` на страницу `/<username>/<post_id>/edit/` 3 поля'
         )
         assert 'group' in response.context['form'].fields, (
             'Проверьте, что в форме `form` на странице `/new/` есть поле `group`'
@@ -102,6 +102,16 @@ class TestPostEditView:
             'Проверьте, что в форме `form` на странице `/new/` поле `group` обязательно'
         )
 
+        assert 'image' in response.context['form'].fields, (
+            'Проверьте, что в форме `form` на странице `/new/` есть поле `image`'
+        )
+        assert isinstance(response.context['form'].fields['image'], forms.fields.FileField), (
+            'Проверьте, что в форме `form` на странице `/new/` поле `image` типа `FileField`'
+        )
+        assert not response.context['form'].fields['image'].required, (
+            'Проверьте, что в форме `form` на странице `/new/` поле `image` не обязательно'
+        )
+
     @pytest.mark.django_db(transaction=True)
     def test_post_edit_view_author_post(self, user_client, post_with_group):
         text = 'Проверка изменения поста!'
@@ -0,0 +1,23 @@
+import os
+
+import django
+from django.core.handlers.asgi import ASGIHandler
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+
+ASGI_URLCONF = 'yatube.asgi_urls'
+
+
+class AsyncFeedsHandler(ASGIHandler):
+    """Обработчик ASGI, отдающий запросы маршрутам yatube.asgi_urls."""
+
+    def create_request(self, scope, body_file):
+        request, error_response = super().create_request(scope, body_file)
+        if request is not None:
+            request.urlconf = ASGI_URLCONF
+        return request, error_response
+
+
+# То же, что django.core.asgi.get_asgi_application.
+django.setup(set_prefix=False)
+application = AsyncFeedsHandler()
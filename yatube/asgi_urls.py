@@ -0,0 +1,16 @@
+"""Маршруты ASGI-входа: yatube.urls, в которых маршруты posts заменены
+на posts.async_urls (асинхронные ленты и страница поста)."""
+from django.urls import URLResolver
+
+from posts import async_urls, urls as posts_urls
+from . import urls
+
+
+def _async_posts(entry):
+    if isinstance(entry, URLResolver) and entry.urlconf_name is posts_urls:
+        return URLResolver(entry.pattern, async_urls, entry.default_kwargs,
+                           entry.app_name, entry.namespace)
+    return entry
+
+
+urlpatterns = [_async_posts(entry) for entry in urls.urlpatterns]
@@ -0,0 +1,26 @@
+"""Файловый кэш для боевого профиля.
+
+Django перед каждой записью в FileBasedCache перечисляет весь каталог
+кэша, чтобы сравнить число файлов с ``MAX_ENTRIES``. На сотнях тысяч
+карточек и страниц это дороже самой записи, поэтому здесь проверка
+идёт не чаще раза в ``CULL_INTERVAL`` секунд на экземпляр кэша; между
+проверками каталог может ненадолго превысить ``MAX_ENTRIES``.
+"""
+import time
+
+from django.core.cache.backends import filebased
+
+
+class FileBasedCache(filebased.FileBasedCache):
+    def __init__(self, dir, params):
+        super().__init__(dir, params)
+        options = params.get('OPTIONS', {})
+        self._cull_interval = float(options.get('CULL_INTERVAL', 60))
+        self._next_cull = 0
+
+    def _cull(self):
+        now = time.monotonic()
+        if now < self._next_cull:
+            return
+        self._next_cull = now + self._cull_interval
+        super()._cull()
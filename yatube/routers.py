@@ -0,0 +1,79 @@
+"""Чтение лент с реплик базы.
+
+View, обёрнутые в ``read_from_replica``, читают с одной из баз
+``DATABASE_REPLICAS``; остальные запросы и все записи идут в ``default``.
+Реплика отстаёт от основной базы, поэтому после изменяющего запроса
+(POST и т.п.) ``PinPrimaryMiddleware`` ставит cookie, и ещё
+``REPLICA_PIN_SECONDS`` секунд чтения этого посетителя идут в основную
+базу: автор сразу видит свой пост.
+
+Реплика выбирается одна на запрос: ETag, ключ кэша страницы и сама
+страница читают один и тот же снимок данных.
+"""
+import random
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.utils.deprecation import MiddlewareMixin
+
+PRIMARY = 'default'
+PIN_COOKIE = 'primary_until'
+# Сессии пишутся почти на каждый запрос и читаются до view: с реплики
+# они приходили бы устаревшими.
+PRIMARY_ONLY_APPS = {'sessions'}
+
+# Псевдоним реплики, с которой читает текущий запрос.
+replica_reads = ContextVar('replica_reads', default=None)
+
+
+def is_pinned(request):
+    try:
+        return float(request.COOKIES.get(PIN_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def read_from_replica(view):
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if (not settings.DATABASE_REPLICAS or request.method != 'GET'
+                or is_pinned(request)):
+            return view(request, *args, **kwargs)
+        token = replica_reads.set(
+            random.choice(settings.DATABASE_REPLICAS))
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            replica_reads.reset(token)
+    return wrapper
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in PRIMARY_ONLY_APPS:
+            return None
+        return replica_reads.get()
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики — копии основной базы: объекты с разных баз связаны
+        # так же, как в основной.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Схему реплики получают вместе с данными при репликации.
+        return db not in settings.DATABASE_REPLICAS
+
+
+class PinPrimaryMiddleware(MiddlewareMixin):
+    def process_response(self, request, response):
+        if request.method not in ('GET', 'HEAD', 'OPTIONS', 'TRACE'):
+            seconds = settings.REPLICA_PIN_SECONDS
+            response.set_cookie(PIN_COOKIE, str(time.time() + seconds),
+                                max_age=seconds, httponly=True,
+                                samesite='Lax')
+        return response
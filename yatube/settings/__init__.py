@@ -0,0 +1,17 @@
+"""Настройки проекта. Профиль выбирает переменная окружения YATUBE_ENV:
+``development`` (по умолчанию, yatube.settings.base) или ``production``
+(yatube.settings.production)."""
+import os
+
+ENVIRONMENT = os.environ.get('YATUBE_ENV', 'development')
+
+if ENVIRONMENT == 'production':
+    from .production import *  # noqa: F401,F403
+elif ENVIRONMENT == 'development':
+    from .base import *  # noqa: F401,F403
+else:
+    from django.core.exceptions import ImproperlyConfigured
+
+    raise ImproperlyConfigured(
+        f'Неизвестное окружение YATUBE_ENV={ENVIRONMENT!r}'
+    )
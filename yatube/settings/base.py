@@ -0,0 +1,179 @@
+import os
+
+# Build paths inside the project like this: os.path.join(BASE_DIR, ...)
+BASE_DIR = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+# Quick-start development settings - unsuitable for production
+# See https://docs.djangoproject.com/en/2.2/howto/deployment/checklist/
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = 'n8wnfn&%-&!r#bjqvv04!wqi31is-ic4=p5abfa_0*+k68v4yl'
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = True
+
+PAGINATE_BY = 10
+
+# Сколько секунд отрисованная карточка поста живёт в кэше (posts.cards)
+POST_CARD_CACHE_TIMEOUT = 60 * 60
+# Сколько секунд страница ленты для анонимов живёт в кэше (posts.page_cache),
+# 0 — не кэшировать
+FEED_PAGE_CACHE_TIMEOUT = 60 * 5
+
+# Ленты групп и авторов из материализованной таблицы (posts.timelines);
+# после включения заполнить её командой backfill_timelines
+FEED_TIMELINES = False
+
+# Очередь фоновых задач (tasks.queue): число попыток, задержка перед
+# первым повтором в секундах (удваивается с каждой попыткой, но не больше
+# TASK_RETRY_MAX_DELAY), аренда задачи обработчиком и как часто
+# run_worker проверяет пустую очередь
+TASK_MAX_ATTEMPTS = 5
+TASK_RETRY_DELAY = 10
+TASK_RETRY_MAX_DELAY = 60 * 60
+TASK_LEASE = 60 * 5
+TASK_POLL_INTERVAL = 1
+
+# Замеры запросов (metrics): размер кольцевого буфера процесса, каталог
+# для сохранения буферов (None — не сохранять) и как часто сохранять
+REQUEST_METRICS_BUFFER = 1000
+REQUEST_METRICS_DIR = None
+REQUEST_METRICS_FLUSH_EVERY = 100
+# Профиль шаблонов в замерах запросов (metrics.profiling) и файл, куда
+# дописываются collapsed stacks для flame graph (None — не писать)
+TEMPLATE_PROFILING = False
+TEMPLATE_PROFILE_FILE = None
+
+ALLOWED_HOSTS = [
+    "localhost",
+    "127.0.0.1",
+    "[::1]",
+    "testserver",
+]
+
+# Application definition
+
+INSTALLED_APPS = [
+    'about',
+    'users',
+    'posts.apps.PostsConfig',
+    'metrics.apps.MetricsConfig',
+    'tasks.apps.TasksConfig',
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'sorl.thumbnail',
+]
+
+MIDDLEWARE = [
+    'metrics.middleware.RequestMetricsMiddleware',
+    'yatube.routers.PinPrimaryMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+# ASGI-вход (yatube.asgi) подставляет запросам yatube.asgi_urls
+# с асинхронными лентами
+ROOT_URLCONF = 'yatube.urls'
+TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [TEMPLATES_DIR],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'yatube.wsgi.application'
+ASGI_APPLICATION = 'yatube.asgi.application'
+# Сколько потоков выполняют запросы к базе асинхронных view
+# (posts.async_views)
+ASYNC_VIEW_THREADS = 8
+
+# Database
+# https://docs.djangoproject.com/en/2.2/ref/settings/#databases
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+    }
+}
+
+# Реплики основной базы для чтения лент (yatube.routers): псевдонимы из
+# DATABASES. После изменяющего запроса посетитель читает из основной
+# базы ещё REPLICA_PIN_SECONDS секунд.
+DATABASE_ROUTERS = ['yatube.routers.ReplicaRouter']
+DATABASE_REPLICAS = []
+REPLICA_PIN_SECONDS = 10
+
+# PRAGMA, которые выполняются на каждом новом соединении с SQLite
+# (posts.signals.tune_sqlite_connection)
+SQLITE_PRAGMAS = {}
+
+# Password validation
+# https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+# Internationalization
+# https://docs.djangoproject.com/en/2.2/topics/i18n/
+
+LANGUAGE_CODE = 'ru'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_L10N = True
+
+USE_TZ = True
+
+LOGIN_URL = "/auth/login/"
+LOGIN_REDIRECT_URL = "index"
+
+STATIC_URL = '/static/'
+STATIC_ROOT = os.path.join(BASE_DIR, 'static')
+
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Письма ставятся в очередь (tasks.mail) и уходят из обработчика задач
+# через EMAIL_DELIVERY_BACKEND пачками по EMAIL_BATCH_SIZE за одно
+# соединение; письмо, не ушедшее EMAIL_MAX_ATTEMPTS раз, не повторяется
+EMAIL_BACKEND = 'tasks.mail.QueuedEmailBackend'
+EMAIL_DELIVERY_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
+EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
+EMAIL_BATCH_SIZE = 50
+EMAIL_MAX_ATTEMPTS = 5
@@ -0,0 +1,85 @@
+"""Боевой профиль: YATUBE_ENV=production."""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .base import *  # noqa: F401,F403
+from .base import ALLOWED_HOSTS, BASE_DIR, DATABASES, TEMPLATES_DIR
+
+DEBUG = False
+
+# Ключ из base.py лежит в репозитории и в бою не годится.
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY')
+if not SECRET_KEY:
+    raise ImproperlyConfigured('Не задана переменная DJANGO_SECRET_KEY')
+if os.environ.get('DJANGO_ALLOWED_HOSTS'):
+    ALLOWED_HOSTS = os.environ['DJANGO_ALLOWED_HOSTS'].split(',')
+
+# Соединение с базой переживает запрос и переиспользуется потоком
+# до истечения CONN_MAX_AGE секунд.
+DATABASES = {'default': {**DATABASES['default'], 'CONN_MAX_AGE': 60}}
+
+# Кэш общий для всех процессов (веб и run_worker): карточки и страницы
+# лент, отрисованные одним процессом, достаются остальным. По умолчанию
+# FileBasedCache держит всего 300 файлов и перечисляет каталог на каждой
+# записи; в кэше лежат карточки постов (до четырёх на пост) и страницы
+# лент, поэтому предел поднят, при переполнении удаляется десятая часть
+# файлов, а каталог перечисляется раз в CULL_INTERVAL секунд
+# (yatube.cache).
+CACHES = {
+    'default': {
+        'BACKEND': 'yatube.cache.FileBasedCache',
+        'LOCATION': os.environ.get('DJANGO_CACHE_DIR',
+                                   os.path.join(BASE_DIR, 'cache')),
+        'OPTIONS': {
+            'MAX_ENTRIES': 200000,
+            'CULL_FREQUENCY': 10,
+            'CULL_INTERVAL': 60,
+        },
+    },
+}
+
+# WAL: читатели не ждут писателя, а писатель — читателей. С WAL
+# synchronous=NORMAL не теряет согласованность при сбое, только
+# последние транзакции. mmap_size и cache_size (в КиБ при минусе)
+# держат горячие страницы ленты в памяти процесса.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+}
+
+# Шаблоны компилируются один раз на процесс: cached-загрузчик держит
+# скомпилированные шаблоны в памяти, а узлы {% post_card %} внутри них
+# держат скомпилированный шаблон карточки.
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [TEMPLATES_DIR],
+        'OPTIONS': {
+            'debug': False,
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+            ],
+        },
+    },
+]
+
+# Письма из очереди (tasks.mail) уходят через SMTP.
+EMAIL_DELIVERY_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+EMAIL_HOST = os.environ.get('DJANGO_EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.environ.get('DJANGO_EMAIL_PORT', 25))
+EMAIL_HOST_USER = os.environ.get('DJANGO_EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.environ.get('DJANGO_EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.environ.get('DJANGO_EMAIL_USE_TLS') == '1'
+EMAIL_TIMEOUT = 10
@@ -0,0 +1,13 @@
+"""Профили настроек как модули — для тестов и бенчмарков, которые
+сравнивают боевые настройки с настройками разработки."""
+import importlib
+import os
+from unittest import mock
+
+
+def production():
+    """Модуль yatube.settings.production. Боевого окружения у тестов
+    нет, поэтому без DJANGO_SECRET_KEY подставляется тестовый ключ."""
+    secret_key = os.environ.get('DJANGO_SECRET_KEY') or 'test'
+    with mock.patch.dict(os.environ, DJANGO_SECRET_KEY=secret_key):
+        return importlib.import_module('yatube.settings.production')
@@ -0,0 +1,31 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from yatube.cache import FileBasedCache
+
+
+class FileBasedCacheTest(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.cache = FileBasedCache(directory, {'OPTIONS': {
+            'MAX_ENTRIES': 2, 'CULL_FREQUENCY': 2, 'CULL_INTERVAL': 60,
+        }})
+
+    def test_directory_is_listed_once_per_interval(self):
+        with mock.patch.object(self.cache, '_list_cache_files',
+                               wraps=self.cache._list_cache_files) as listed:
+            for i in range(5):
+                self.cache.set(f'key{i}', i)
+        listed.assert_called_once()
+        self.assertEqual(self.cache.get('key4'), 4)
+
+    def test_cull_runs_after_interval(self):
+        for i in range(4):
+            self.cache.set(f'key{i}', i)
+        self.cache._next_cull = 0
+        self.cache.set('last', 'value')
+        self.assertLessEqual(len(self.cache._list_cache_files()), 3)
@@ -0,0 +1,112 @@
+import os
+import shutil
+import random
+import tempfile
+from unittest.mock import patch
+
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.db import connections
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post, User
+from yatube.routers import PIN_COOKIE, ReplicaRouter, replica_reads
+
+REPLICA = 'replica'
+
+
+def replicate(source='default', target=REPLICA):
+    """Репликация для тестов: копия базы source поверх target через
+    backup API SQLite."""
+    connections[source].ensure_connection()
+    connections[target].ensure_connection()
+    connections[source].connection.backup(connections[target].connection)
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA], FEED_PAGE_CACHE_TIMEOUT=0)
+class ReplicaRoutingTest(TransactionTestCase):
+    # Реплика — отдельный файл SQLite. Её нет в DATABASES, поэтому
+    # псевдоним добавляется после настройки тестовых баз, а данные
+    # в ней обновляет только replicate().
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directory = tempfile.mkdtemp()
+        connections.databases[REPLICA] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.path.join(cls.directory, 'replica.sqlite3'),
+        }
+        connections.ensure_defaults(REPLICA)
+        connections.prepare_test_settings(REPLICA)
+
+    @classmethod
+    def tearDownClass(cls):
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.databases[REPLICA]
+        shutil.rmtree(cls.directory)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.author = User.objects.create_user(username='ivan')
+        replicate()
+
+    def test_feeds_read_from_replica(self):
+        """Пока пост не дошёл до реплики, ленты его не показывают."""
+        post = Post.objects.create(text='Ещё не на реплике',
+                                   author=self.author)
+        urls = (
+            reverse('index'),
+            reverse('profile', kwargs={'username': 'ivan'}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertNotContains(self.client.get(url), post.text)
+        replicate()
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertContains(self.client.get(url), post.text)
+
+    def test_writer_reads_own_writes(self):
+        """После публикации автор читает из основной базы, остальные —
+        с реплики."""
+        self.client.force_login(self.author)
+        response = self.client.post(reverse('new_post'),
+                                    {'text': 'Свежий пост'})
+        self.assertIn(PIN_COOKIE, response.cookies)
+        self.assertContains(self.client.get(reverse('index')), 'Свежий пост')
+        self.assertNotContains(self.client_class().get(reverse('index')),
+                               'Свежий пост')
+
+    def test_writes_and_unmarked_reads_use_primary(self):
+        router = ReplicaRouter()
+        self.assertEqual(router.db_for_write(Post), 'default')
+        self.assertIsNone(router.db_for_read(Post))
+        token = replica_reads.set(REPLICA)
+        try:
+            self.assertEqual(router.db_for_read(Post), REPLICA)
+            self.assertIsNone(router.db_for_read(Session))
+        finally:
+            replica_reads.reset(token)
+
+    def test_one_replica_per_request(self):
+        with patch('yatube.routers.random.choice',
+                   wraps=random.choice) as choice:
+            self.client.get(reverse('index'))
+        choice.assert_called_once_with([REPLICA])
+
+    @override_settings(FEED_PAGE_CACHE_TIMEOUT=60)
+    def test_lagging_replica_pages_are_not_cached(self):
+        """Страница, прочитанная с отстающей реплики, не попадает в кэш
+        и не переживает репликацию."""
+        cache.clear()
+        post = Post.objects.create(text='Ещё не на реплике',
+                                   author=self.author)
+        url = reverse('index')
+        self.assertNotContains(self.client.get(url), post.text)
+        replicate()
+        self.assertContains(self.client.get(url), post.text)
+        # Пока не прошло REPLICA_PIN_SECONDS, страницы не кэшируются.
+        self.assertIsNotNone(self.client.get(url).context)
@@ -1,3 +1,5 @@
+from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 
@@ -5,6 +7,10 @@ urlpatterns = [
     path("auth/", include("users.urls")),
     path("auth/", include("django.contrib.auth.urls")),
     path("adminpanel/", admin.site.urls),
+    path("metrics/", include("metrics.urls")),
     path("", include("posts.urls")),
     path("", include("about.urls")),
 ]
+
+# В бою /media/ отдаёт веб-сервер.
+urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)